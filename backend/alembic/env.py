@@ -9,7 +9,7 @@ from alembic import context
 
 from app.config import get_settings
 from app.database import Base
-from app.models import User, Task, RefreshToken
+from app.models import User, Task, RefreshToken, UserTaskStats
 
 config = context.config
 
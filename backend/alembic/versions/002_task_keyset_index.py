@@ -0,0 +1,23 @@
+"""Composite index for keyset pagination of tasks
+
+Revision ID: 002_task_keyset
+Revises: 001_initial
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '002_task_keyset'
+down_revision: Union[str, None] = '001_initial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Serves ORDER BY created_at DESC, id DESC (backward scan) and the
+    # (created_at, id) < (:created_at, :id) seek within a single user's tasks
+    op.create_index('ix_tasks_user_created_id', 'tasks', ['user_id', 'created_at', 'id'])
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_user_created_id', table_name='tasks')
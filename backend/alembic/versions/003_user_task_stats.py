@@ -0,0 +1,98 @@
+"""Per-user task counters maintained by triggers
+
+Revision ID: 003_user_task_stats
+Revises: 002_task_keyset
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '003_user_task_stats'
+down_revision: Union[str, None] = '002_task_keyset'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table(
+        'user_task_stats',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('total_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tasks_maintain_user_stats() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO user_task_stats AS s (user_id, total_count, completed_count)
+                SELECT user_id, count(*), count(*) FILTER (WHERE is_completed)
+                FROM new_rows GROUP BY user_id
+                ON CONFLICT (user_id) DO UPDATE
+                SET total_count = s.total_count + EXCLUDED.total_count,
+                    completed_count = s.completed_count + EXCLUDED.completed_count;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE user_task_stats AS s
+                SET total_count = s.total_count - d.total_count,
+                    completed_count = s.completed_count - d.completed_count
+                FROM (
+                    SELECT user_id, count(*) AS total_count,
+                           count(*) FILTER (WHERE is_completed) AS completed_count
+                    FROM old_rows GROUP BY user_id
+                ) AS d
+                WHERE s.user_id = d.user_id;
+            ELSE
+                INSERT INTO user_task_stats AS s (user_id, total_count, completed_count)
+                SELECT user_id, sum(total_delta), sum(completed_delta)
+                FROM (
+                    SELECT user_id, -1 AS total_delta, -is_completed::int AS completed_delta FROM old_rows
+                    UNION ALL
+                    SELECT user_id, 1, is_completed::int FROM new_rows
+                ) AS changes
+                GROUP BY user_id
+                HAVING sum(total_delta) <> 0 OR sum(completed_delta) <> 0
+                ON CONFLICT (user_id) DO UPDATE
+                SET total_count = s.total_count + EXCLUDED.total_count,
+                    completed_count = s.completed_count + EXCLUDED.completed_count;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_stats_insert AFTER INSERT ON tasks
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_maintain_user_stats()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_stats_update AFTER UPDATE ON tasks
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_maintain_user_stats()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_stats_delete AFTER DELETE ON tasks
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_maintain_user_stats()
+    """)
+
+    # Backfill existing counters. FORCE RLS would hide every row from the
+    # owner here, so lift it for the duration of the backfill.
+    op.execute("ALTER TABLE tasks NO FORCE ROW LEVEL SECURITY")
+    op.execute("""
+        INSERT INTO user_task_stats (user_id, total_count, completed_count)
+        SELECT user_id, count(*), count(*) FILTER (WHERE is_completed)
+        FROM tasks GROUP BY user_id
+    """)
+    op.execute("ALTER TABLE tasks FORCE ROW LEVEL SECURITY")
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS tasks_stats_delete ON tasks")
+    op.execute("DROP TRIGGER IF EXISTS tasks_stats_update ON tasks")
+    op.execute("DROP TRIGGER IF EXISTS tasks_stats_insert ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS tasks_maintain_user_stats()")
+    op.drop_table('user_task_stats')
@@ -0,0 +1,107 @@
+"""Per-user task list version for ETags
+
+Revision ID: 004_task_list_version
+Revises: 003_user_task_stats
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '004_task_list_version'
+down_revision: Union[str, None] = '003_user_task_stats'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.add_column(
+        'user_task_stats',
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+
+    # Same counters as before, plus a version bump for every user whose tasks
+    # a statement touched
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tasks_maintain_user_stats() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO user_task_stats AS s (user_id, total_count, completed_count, version)
+                SELECT user_id, count(*), count(*) FILTER (WHERE is_completed), 1
+                FROM new_rows GROUP BY user_id
+                ON CONFLICT (user_id) DO UPDATE
+                SET total_count = s.total_count + EXCLUDED.total_count,
+                    completed_count = s.completed_count + EXCLUDED.completed_count,
+                    version = s.version + 1;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE user_task_stats AS s
+                SET total_count = s.total_count - d.total_count,
+                    completed_count = s.completed_count - d.completed_count,
+                    version = s.version + 1
+                FROM (
+                    SELECT user_id, count(*) AS total_count,
+                           count(*) FILTER (WHERE is_completed) AS completed_count
+                    FROM old_rows GROUP BY user_id
+                ) AS d
+                WHERE s.user_id = d.user_id;
+            ELSE
+                -- Every updated user gets a version bump, even when counters are unchanged
+                INSERT INTO user_task_stats AS s (user_id, total_count, completed_count, version)
+                SELECT user_id, sum(total_delta), sum(completed_delta), 1
+                FROM (
+                    SELECT user_id, -1 AS total_delta, -is_completed::int AS completed_delta FROM old_rows
+                    UNION ALL
+                    SELECT user_id, 1, is_completed::int FROM new_rows
+                ) AS changes
+                GROUP BY user_id
+                ON CONFLICT (user_id) DO UPDATE
+                SET total_count = s.total_count + EXCLUDED.total_count,
+                    completed_count = s.completed_count + EXCLUDED.completed_count,
+                    version = s.version + 1;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+def downgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tasks_maintain_user_stats() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO user_task_stats AS s (user_id, total_count, completed_count)
+                SELECT user_id, count(*), count(*) FILTER (WHERE is_completed)
+                FROM new_rows GROUP BY user_id
+                ON CONFLICT (user_id) DO UPDATE
+                SET total_count = s.total_count + EXCLUDED.total_count,
+                    completed_count = s.completed_count + EXCLUDED.completed_count;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE user_task_stats AS s
+                SET total_count = s.total_count - d.total_count,
+                    completed_count = s.completed_count - d.completed_count
+                FROM (
+                    SELECT user_id, count(*) AS total_count,
+                           count(*) FILTER (WHERE is_completed) AS completed_count
+                    FROM old_rows GROUP BY user_id
+                ) AS d
+                WHERE s.user_id = d.user_id;
+            ELSE
+                INSERT INTO user_task_stats AS s (user_id, total_count, completed_count)
+                SELECT user_id, sum(total_delta), sum(completed_delta)
+                FROM (
+                    SELECT user_id, -1 AS total_delta, -is_completed::int AS completed_delta FROM old_rows
+                    UNION ALL
+                    SELECT user_id, 1, is_completed::int FROM new_rows
+                ) AS changes
+                GROUP BY user_id
+                HAVING sum(total_delta) <> 0 OR sum(completed_delta) <> 0
+                ON CONFLICT (user_id) DO UPDATE
+                SET total_count = s.total_count + EXCLUDED.total_count,
+                    completed_count = s.completed_count + EXCLUDED.completed_count;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.drop_column('user_task_stats', 'version')
@@ -0,0 +1,41 @@
+"""Full-text search vector on tasks
+
+Revision ID: 005_task_search
+Revises: 004_task_list_version
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '005_task_search'
+down_revision: Union[str, None] = '004_task_list_version'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Stored generated column: Postgres keeps it in sync on every write.
+    # Adding it rewrites the table under an exclusive lock, so run this
+    # migration off-peak on large installations.
+    op.add_column(
+        'tasks',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', title), 'A') || "
+                "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+        ),
+    )
+    op.create_index(
+        'ix_tasks_search_vector', 'tasks', ['search_vector'], postgresql_using='gin'
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_search_vector', table_name='tasks')
+    op.drop_column('tasks', 'search_vector')
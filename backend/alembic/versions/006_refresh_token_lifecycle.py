@@ -0,0 +1,76 @@
+"""Compact refresh token hashes and let expired tokens be purged
+
+Revision ID: 006_refresh_token_lifecycle
+Revises: 005_task_search
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '006_refresh_token_lifecycle'
+down_revision: Union[str, None] = '005_task_search'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # FORCE RLS would hide every row from the owner in the statements below
+    op.execute("ALTER TABLE refresh_tokens NO FORCE ROW LEVEL SECURITY")
+
+    # 64 hex characters become the 32 raw digest bytes
+    op.drop_index('ix_refresh_tokens_token_hash', table_name='refresh_tokens')
+    op.alter_column(
+        'refresh_tokens',
+        'token_hash',
+        type_=postgresql.BYTEA(),
+        postgresql_using="decode(token_hash, 'hex')",
+    )
+    op.create_check_constraint(
+        'ck_refresh_tokens_token_hash_length', 'refresh_tokens', 'octet_length(token_hash) = 32'
+    )
+    # Keep the newest row of any duplicate before enforcing uniqueness
+    op.execute("""
+        DELETE FROM refresh_tokens older
+        USING refresh_tokens newer
+        WHERE older.token_hash = newer.token_hash
+          AND (older.created_at, older.id) < (newer.created_at, newer.id)
+    """)
+    op.create_index('ix_refresh_tokens_token_hash', 'refresh_tokens', ['token_hash'], unique=True)
+
+    # Rotation now pulls a revoked token's expiry in to the end of the reuse
+    # grace window; apply the same to tokens rotated before this change so
+    # expires_at alone decides what the purge removes
+    op.execute("""
+        UPDATE refresh_tokens
+        SET expires_at = least(expires_at, revoked_at + interval '30 seconds')
+        WHERE revoked_at IS NOT NULL
+    """)
+    op.create_index('ix_refresh_tokens_expires_at', 'refresh_tokens', ['expires_at'])
+
+    op.execute("ALTER TABLE refresh_tokens FORCE ROW LEVEL SECURITY")
+
+    # The purge runs without a user context. This policy exposes expired
+    # rows, and only while the purge's setting is on; WITH CHECK (false)
+    # means it never admits a written row.
+    op.execute("""
+        CREATE POLICY refresh_tokens_purge_policy ON refresh_tokens
+        FOR ALL
+        USING (current_setting('app.purge_expired_tokens', true) = 'on' AND expires_at < now())
+        WITH CHECK (false)
+    """)
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS refresh_tokens_purge_policy ON refresh_tokens")
+    op.drop_index('ix_refresh_tokens_expires_at', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_token_hash', table_name='refresh_tokens')
+    op.drop_constraint('ck_refresh_tokens_token_hash_length', 'refresh_tokens', type_='check')
+    op.alter_column(
+        'refresh_tokens',
+        'token_hash',
+        type_=sa.String(255),
+        postgresql_using="encode(token_hash, 'hex')",
+    )
+    op.create_index('ix_refresh_tokens_token_hash', 'refresh_tokens', ['token_hash'])
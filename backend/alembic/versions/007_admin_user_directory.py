@@ -0,0 +1,34 @@
+"""Indexes for the admin user directory: keyset paging and email search
+
+Revision ID: 007_admin_user_directory
+Revises: 006_refresh_token_lifecycle
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '007_admin_user_directory'
+down_revision: Union[str, None] = '006_refresh_token_lifecycle'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Serves ORDER BY created_at DESC, id DESC (backward scan) and the
+    # (created_at, id) < (:created_at, :id) seek across all users
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'])
+
+    # Trigram index for case-insensitive prefix and substring email matches
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_users_email_trgm',
+        'users',
+        ['email'],
+        postgresql_using='gin',
+        postgresql_ops={'email': 'gin_trgm_ops'},
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_trgm', table_name='users')
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -1,30 +1,78 @@
 from uuid import UUID
 from fastapi import APIRouter, HTTPException, status, Query
 
-from app.api.deps import DbSession, AdminUser
-from app.schemas.admin import AdminUserResponse, AdminUserListResponse, UserStatusUpdate
+from app.api.deps import DbSession, ReadDbSession, AdminUser
+from app.api.responses import ORJSONResponse, project
+from app.config import get_settings
+from app.database import pool_stats
+from app.models.user import UserRole
+from app.schemas.admin import (
+    AdminUserResponse,
+    AdminUserListResponse,
+    UserStatusUpdate,
+    CacheStatsResponse,
+    HashingPoolStatsResponse,
+    LastLoginBufferStatsResponse,
+    RefreshTokenPurgeStatsResponse,
+    InvalidationBusStatsResponse,
+    DbPoolStatsResponse,
+    RuntimeStatsResponse,
+)
 from app.services.admin import AdminService
+from app.services.auth import principal_cache, verified_token_cache
+from app.services.hashing import hashing_pool
+from app.services.invalidation import invalidation_bus
+from app.services.pagination import InvalidCursorError, decode_cursor
+from app.services.login_buffer import last_login_buffer
+from app.services.token_purge import refresh_token_purger
+
+settings = get_settings()
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 @router.get("/users", response_model=AdminUserListResponse)
 async def list_users(
-    db: DbSession,
+    db: ReadDbSession,
     admin: AdminUser,
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    email: str | None = Query(
+        None, min_length=1, max_length=255, description="Case-insensitive email prefix or substring"
+    ),
+    is_active: bool | None = Query(None),
+    role: UserRole | None = Query(None),
 ):
+    seek = None
+    if cursor is not None:
+        try:
+            seek = decode_cursor(cursor)
+        except InvalidCursorError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+
     service = AdminService(db)
-    users, total = await service.list_users(limit=limit, offset=offset)
-    return AdminUserListResponse(
-        users=[AdminUserResponse(**u) for u in users],
-        total=total,
+    cap = settings.admin_user_count_limit
+    users, total, next_cursor = await service.list_users(
+        limit=limit,
+        cursor=seek,
+        email=email,
+        is_active=is_active,
+        role=role,
+        count_limit=cap,
     )
+    return ORJSONResponse({
+        "users": [project(u, AdminUserResponse) for u in users],
+        "total": min(total, cap) if total is not None else None,
+        "total_capped": total is not None and total > cap,
+        "next_cursor": next_cursor,
+    })
 
 @router.get("/users/{user_id}", response_model=AdminUserResponse)
 async def get_user(
     user_id: UUID,
-    db: DbSession,
+    db: ReadDbSession,
     admin: AdminUser,
 ):
     service = AdminService(db)
@@ -34,7 +82,7 @@ async def get_user(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
-    return AdminUserResponse(**user)
+    return ORJSONResponse(project(user, AdminUserResponse))
 
 @router.patch("/users/{user_id}", response_model=AdminUserResponse)
 async def update_user_status(
@@ -57,4 +105,17 @@ async def update_user_status(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
-    return AdminUserResponse(**user)
+    return ORJSONResponse(project(user, AdminUserResponse))
+
+@router.get("/runtime", response_model=RuntimeStatsResponse)
+async def get_runtime_stats(admin: AdminUser):
+    # Per-worker counters; each uvicorn worker reports its own process
+    return ORJSONResponse({
+        "principal_cache": project(principal_cache.stats(), CacheStatsResponse),
+        "access_token_cache": project(verified_token_cache.stats(), CacheStatsResponse),
+        "hashing_pool": project(hashing_pool.stats(), HashingPoolStatsResponse),
+        "last_login_buffer": project(last_login_buffer.stats(), LastLoginBufferStatsResponse),
+        "refresh_token_purge": project(refresh_token_purger.stats(), RefreshTokenPurgeStatsResponse),
+        "invalidation_bus": project(invalidation_bus.stats(), InvalidationBusStatsResponse),
+        "db_pool": project(pool_stats(), DbPoolStatsResponse),
+    })
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, status, Response, Cookie
 from typing import Annotated
 
-from app.api.deps import DbSession, CurrentUser
+from app.api.deps import DbSession, ReadDbSession, CurrentUser
+from app.api.responses import ORJSONResponse, project
 from app.schemas.user import UserCreate, UserResponse, LoginRequest, AuthResponse, TokenRefreshResponse
 from app.services.auth import (
     create_user,
@@ -11,15 +12,16 @@ from app.services.auth import (
     create_access_token,
     generate_refresh_token,
     create_refresh_token_record,
-    validate_refresh_token,
+    rotate_refresh_token,
     revoke_refresh_token,
     revoke_all_user_tokens,
+    get_user_by_id,
 )
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, response: Response, db: DbSession):
+async def register(user_data: UserCreate, db: DbSession):
     existing_user = await get_user_by_email(db, user_data.email)
     if existing_user:
         raise HTTPException(
@@ -37,6 +39,10 @@ async def register(user_data: UserCreate, response: Response, db: DbSession):
     refresh_token = generate_refresh_token()
     await create_refresh_token_record(db, user.id, refresh_token)
 
+    response = ORJSONResponse(
+        project({"access_token": access_token, "user": project(user, UserResponse)}, AuthResponse),
+        status_code=status.HTTP_201_CREATED,
+    )
     response.set_cookie(
         key="refresh_token",
         value=refresh_token,
@@ -45,14 +51,10 @@ async def register(user_data: UserCreate, response: Response, db: DbSession):
         samesite="lax",
         max_age=60 * 60 * 24 * 7,  # 7 days
     )
-
-    return AuthResponse(
-        access_token=access_token,
-        user=UserResponse.model_validate(user),
-    )
+    return response
 
 @router.post("/login", response_model=AuthResponse)
-async def login(login_data: LoginRequest, response: Response, db: DbSession):
+async def login(login_data: LoginRequest, db: DbSession):
     user = await authenticate_user(db, login_data.email, login_data.password)
 
     if not user:
@@ -76,6 +78,9 @@ async def login(login_data: LoginRequest, response: Response, db: DbSession):
     refresh_token = generate_refresh_token()
     await create_refresh_token_record(db, user.id, refresh_token)
 
+    response = ORJSONResponse(
+        project({"access_token": access_token, "user": project(user, UserResponse)}, AuthResponse)
+    )
     response.set_cookie(
         key="refresh_token",
         value=refresh_token,
@@ -84,11 +89,7 @@ async def login(login_data: LoginRequest, response: Response, db: DbSession):
         samesite="lax",
         max_age=60 * 60 * 24 * 7,
     )
-
-    return AuthResponse(
-        access_token=access_token,
-        user=UserResponse.model_validate(user),
-    )
+    return response
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
 async def logout(
@@ -104,7 +105,6 @@ async def logout(
 
 @router.post("/refresh", response_model=TokenRefreshResponse)
 async def refresh_access_token(
-    response: Response,
     db: DbSession,
     refresh_token: Annotated[str | None, Cookie()] = None,
 ):
@@ -114,27 +114,20 @@ async def refresh_access_token(
             detail="Refresh token required",
         )
 
-    token_record = await validate_refresh_token(db, refresh_token)
-    if not token_record:
+    # Validate, revoke and replace (rotation) in one statement
+    rotated = await rotate_refresh_token(db, refresh_token)
+    if rotated is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token",
         )
+    user, new_refresh_token = rotated
 
-    from app.services.auth import get_user_by_id
-    user = await get_user_by_id(db, token_record.user_id)
-
-    if not user or not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found or inactive",
-        )
-
-    # Revoke old token and create new one (rotation)
-    await revoke_refresh_token(db, refresh_token)
-    new_refresh_token = generate_refresh_token()
-    await create_refresh_token_record(db, user.id, new_refresh_token)
+    access_token = create_access_token(
+        {"sub": str(user.id), "email": user.email, "role": user.role.value}
+    )
 
+    response = ORJSONResponse(project({"access_token": access_token}, TokenRefreshResponse))
     response.set_cookie(
         key="refresh_token",
         value=new_refresh_token,
@@ -143,13 +136,15 @@ async def refresh_access_token(
         samesite="lax",
         max_age=60 * 60 * 24 * 7,
     )
-
-    access_token = create_access_token(
-        {"sub": str(user.id), "email": user.email, "role": user.role.value}
-    )
-
-    return TokenRefreshResponse(access_token=access_token)
+    return response
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: CurrentUser):
-    return UserResponse.model_validate(current_user)
+async def get_current_user_info(current_user: CurrentUser, db: ReadDbSession):
+    # The cached principal only carries auth fields; load the full profile
+    user = await get_user_by_id(db, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    return ORJSONResponse(project(user, UserResponse))
@@ -1,20 +1,26 @@
+from collections.abc import AsyncGenerator
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db, set_rls_context
-from app.models.user import User, UserRole
-from app.services.auth import decode_access_token, get_user_by_id
+from app.database import get_db, mark_recent_write, replica_session_maker_for, set_rls_context
+from app.models.user import UserRole
+from app.services.auth import Principal, decode_access_token, get_principal
+from app.services.invalidation import RECENT_WRITE, invalidation_bus
 
 security = HTTPBearer()
 
+# Methods that never write; anything else makes the user's reads sticky
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
 async def get_current_user(
+    request: Request,
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
     db: Annotated[AsyncSession, Depends(get_db)],
-) -> User:
+) -> Principal:
     token = credentials.credentials
     payload = decode_access_token(token)
 
@@ -42,7 +48,11 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = await get_user_by_id(db, user_uuid)
+    # Applied lazily by the session's begin hook, so this costs nothing when
+    # the principal is cached and the handler reads from a replica
+    await set_rls_context(db, str(user_uuid))
+
+    user = await get_principal(db, user_uuid)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -56,14 +66,34 @@ async def get_current_user(
             detail="Account is deactivated",
         )
 
-    # Set RLS context for this request
-    await set_rls_context(db, str(user.id))
+    if request.method not in SAFE_METHODS and mark_recent_write(user.id):
+        # Once per sticky window, so the user's next read on any worker
+        # also avoids the replicas
+        invalidation_bus.broadcast(RECENT_WRITE, user.id)
 
     return user
 
+async def get_read_db(
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only handlers: a replica, unless the user just wrote.
+
+    Falls back to the request's primary session when no replica is
+    configured. Replica sessions get their own RLS context.
+    """
+    session_maker = replica_session_maker_for(current_user.id)
+    if session_maker is None:
+        yield db
+        return
+
+    async with session_maker() as session:
+        await set_rls_context(session, str(current_user.id))
+        yield session
+
 async def require_admin(
-    current_user: Annotated[User, Depends(get_current_user)],
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_user)],
+) -> Principal:
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -71,6 +101,7 @@ async def require_admin(
         )
     return current_user
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
-AdminUser = Annotated[User, Depends(require_admin)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+AdminUser = Annotated[Principal, Depends(require_admin)]
 DbSession = Annotated[AsyncSession, Depends(get_db)]
+ReadDbSession = Annotated[AsyncSession, Depends(get_read_db)]
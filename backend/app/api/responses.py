@@ -0,0 +1,52 @@
+from functools import cache
+from typing import Any
+from uuid import UUID
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+# Match pydantic's own output ("...Z") for UTC datetimes
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+def _default(obj: Any) -> Any:
+    # orjson only handles uuid.UUID exactly; asyncpg returns its own subclass
+    if isinstance(obj, UUID):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson; the app's default response class."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+@cache
+def _fields(schema: type[BaseModel]) -> tuple[tuple[str, Any], ...]:
+    return tuple((name, field.get_default()) for name, field in schema.model_fields.items())
+
+def project(obj: Any, schema: type[BaseModel]) -> dict[str, Any]:
+    """Pick ``schema``'s fields off an ORM object, row or dict without validating.
+
+    Handlers return ORJSONResponse(project(...)) instead of building pydantic
+    models that FastAPI would validate and serialize a second time through
+    response_model, which then only documents the shape. Values must already
+    have the schema's types; nested schemas are projected by the caller.
+    Missing fields take the schema's default; a missing required field raises
+    KeyError (dicts) or AttributeError here rather than failing in render().
+    """
+    if isinstance(obj, dict):
+        projected = {name: obj.get(name, default) for name, default in _fields(schema)}
+    else:
+        projected = {name: getattr(obj, name, default) for name, default in _fields(schema)}
+    for name, value in projected.items():
+        if value is PydanticUndefined:
+            error = KeyError if isinstance(obj, dict) else AttributeError
+            raise error(
+                f"{schema.__name__}.{name} is required but {type(obj).__name__} has no {name!r}"
+            )
+    return projected
@@ -1,32 +1,148 @@
+import csv
+import hashlib
+import io
+from collections.abc import AsyncIterator
+from typing import Literal
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, Header, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import DbSession, CurrentUser
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskListResponse
+from app.api.deps import DbSession, ReadDbSession, CurrentUser
+from app.api.responses import ORJSONResponse, dumps, project
+from app.config import get_settings
+from app.database import set_rls_context
+from app.schemas.task import (
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    TaskListResponse,
+    TaskSearchResponse,
+    TaskStatsResponse,
+    TaskBatchRequest,
+    TaskBatchResponse,
+    TaskBatchResult,
+    TaskImportResponse,
+    TaskImportRejection,
+)
+from app.services.pagination import InvalidCursorError, decode_cursor, decode_search_cursor
+from app.services.task_import import ImportLimitExceededError, TaskImporter, iter_records
 from app.services.task import TaskService
 
+settings = get_settings()
+
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
+# Clients must revalidate every time, and shared caches must not store replies
+CACHE_CONTROL = "private, no-cache"
+
+def _weak_etag(*parts: object) -> str:
+    digest = hashlib.blake2b(
+        "\x1f".join(str(part) for part in parts).encode(), digest_size=12
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+def _not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
 @router.get("", response_model=TaskListResponse)
 async def list_tasks(
-    db: DbSession,
+    db: ReadDbSession,
     current_user: CurrentUser,
     is_completed: bool | None = Query(None, description="Filter by completion status"),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    if_none_match: str | None = Header(None),
 ):
+    seek = None
+    if cursor is not None:
+        try:
+            seek = decode_cursor(cursor)
+        except InvalidCursorError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+
     service = TaskService(db)
-    tasks, total = await service.list_tasks(
+    # The stats row carries a version bumped on every write to the user's
+    # tasks, so an unchanged list costs one primary-key lookup and no page query
+    stats = await service.get_stats(current_user.id)
+    etag = _weak_etag(current_user.id, stats.version, is_completed, limit, offset, cursor)
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+
+    tasks, total, next_cursor = await service.list_tasks(
         user_id=current_user.id,
         is_completed=is_completed,
         limit=limit,
         offset=offset,
+        cursor=seek,
+        stats=stats,
     )
-    return TaskListResponse(
-        tasks=[TaskResponse.model_validate(t) for t in tasks],
-        total=total,
+    return ORJSONResponse(
+        {
+            "tasks": [project(t, TaskResponse) for t in tasks],
+            "total": total,
+            "next_cursor": next_cursor,
+        },
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
     )
 
+@router.get("/stats", response_model=TaskStatsResponse)
+async def get_task_stats(
+    db: ReadDbSession,
+    current_user: CurrentUser,
+):
+    service = TaskService(db)
+    stats = await service.get_stats(current_user.id)
+    return ORJSONResponse(
+        {"total": stats.total, "completed": stats.completed, "open": stats.total - stats.completed}
+    )
+
+@router.get("/search", response_model=TaskSearchResponse)
+async def search_tasks(
+    db: ReadDbSession,
+    current_user: CurrentUser,
+    q: str = Query(
+        ..., min_length=1, max_length=256,
+        description='Search terms; supports "quoted phrases", OR and -exclusions',
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="Opaque cursor from the previous page's next_cursor"),
+):
+    seek = None
+    if cursor is not None:
+        try:
+            seek = decode_search_cursor(cursor)
+        except InvalidCursorError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+
+    service = TaskService(db)
+    tasks, next_cursor = await service.search(current_user.id, q, limit=limit, cursor=seek)
+    return ORJSONResponse({
+        "tasks": [project(t, TaskResponse) for t in tasks],
+        "next_cursor": next_cursor,
+    })
+
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task_data: TaskCreate,
@@ -35,22 +151,144 @@ async def create_task(
 ):
     service = TaskService(db)
     task = await service.create(current_user.id, task_data)
-    return TaskResponse.model_validate(task)
+    return ORJSONResponse(project(task, TaskResponse), status_code=status.HTTP_201_CREATED)
+
+@router.post("/batch", response_model=TaskBatchResponse)
+async def batch_tasks(
+    batch: TaskBatchRequest,
+    db: DbSession,
+    current_user: CurrentUser,
+):
+    targeted = [op.id for op in batch.operations if op.op in ("update", "delete")]
+    if len(targeted) != len(set(targeted)):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Each task may be updated or deleted at most once per batch",
+        )
+
+    service = TaskService(db)
+    results = await service.apply_batch(current_user.id, batch.operations)
+    return ORJSONResponse({
+        "results": [
+            {
+                **project(r, TaskBatchResult),
+                "task": project(r["task"], TaskResponse) if "task" in r else None,
+            }
+            for r in results
+        ],
+    })
+
+EXPORT_COLUMNS = ["id", "title", "description", "is_completed", "created_at", "updated_at"]
+EXPORT_CHUNK_ROWS = 500
+
+async def _export_rows(session: AsyncSession, user_id: UUID, export_format: str) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == "csv":
+        writer.writerow(EXPORT_COLUMNS)
+
+    rows = 0
+    async for row in TaskService(session).iter_tasks(user_id, batch_size=EXPORT_CHUNK_ROWS):
+        if export_format == "csv":
+            writer.writerow([
+                row.id, row.title, row.description, row.is_completed,
+                row.created_at.isoformat(), row.updated_at.isoformat(),
+            ])
+        else:
+            buffer.write(dumps(project(row, TaskResponse)).decode())
+            buffer.write("\n")
+
+        rows += 1
+        if rows % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+@router.get("/export")
+async def export_tasks(
+    db: ReadDbSession,
+    current_user: CurrentUser,
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+):
+    user_id = current_user.id
+
+    async def generate() -> AsyncIterator[str]:
+        # The body outlives the request-scoped session, so stream from a
+        # dedicated one on the same engine, inside its own transaction
+        # (required for the server-side cursor) with the RLS context applied
+        async with AsyncSession(db.bind, expire_on_commit=False) as session, session.begin():
+            await set_rls_context(session, str(user_id))
+            async for chunk in _export_rows(session, user_id, export_format):
+                yield chunk
+
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tasks.{export_format}"'},
+    )
+
+@router.post("/import", response_model=TaskImportResponse)
+async def import_tasks(
+    request: Request,
+    db: DbSession,
+    current_user: CurrentUser,
+    import_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+):
+    importer = TaskImporter(
+        db,
+        current_user.id,
+        batch_size=settings.task_import_batch_size,
+        max_rows=settings.task_import_max_rows,
+    )
+    try:
+        imported = await importer.run(iter_records(request.stream(), import_format))
+    except ImportLimitExceededError as exc:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(exc),
+        )
+    await db.commit()
+
+    return ORJSONResponse({
+        "imported": imported,
+        "rejected_count": importer.rejected_count,
+        "rejected": [project(r, TaskImportRejection) for r in importer.rejected],
+    })
 
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: UUID,
-    db: DbSession,
+    db: ReadDbSession,
     current_user: CurrentUser,
+    if_none_match: str | None = Header(None),
 ):
     service = TaskService(db)
+    if if_none_match:
+        # Revalidation only needs updated_at, not the whole row
+        updated_at = await service.get_updated_at(task_id, current_user.id)
+        if updated_at is not None:
+            etag = _weak_etag(task_id, updated_at.isoformat())
+            if _etag_matches(if_none_match, etag):
+                return _not_modified(etag)
+
     task = await service.get_by_id(task_id, current_user.id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found",
         )
-    return TaskResponse.model_validate(task)
+    return ORJSONResponse(
+        project(task, TaskResponse),
+        headers={
+            "ETag": _weak_etag(task.id, task.updated_at.isoformat()),
+            "Cache-Control": CACHE_CONTROL,
+        },
+    )
 
 @router.put("/{task_id}", response_model=TaskResponse)
 async def update_task(
@@ -66,7 +304,7 @@ async def update_task(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found",
         )
-    return TaskResponse.model_validate(task)
+    return ORJSONResponse(project(task, TaskResponse))
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(
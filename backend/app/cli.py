@@ -1,12 +1,26 @@
 import asyncio
+import math
+import os
+from collections.abc import AsyncIterator
+from pathlib import Path
+
 import click
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import async_session_maker
-from app.models.user import UserRole
-from app.services.auth import create_user, get_user_by_email
+# Commands import the app's modules themselves, so `--help` and each
+# command only pay for what they use. Keep module-level imports to the
+# standard library and click; benchmarks/bench_import_time.py checks this.
+
+def _settings():
+    from app.config import get_settings
+
+    return get_settings()
 
 async def _create_admin(email: str, password: str) -> None:
+    from app.database import async_session_maker
+    from app.models.user import UserRole
+    from app.services.auth import create_user, get_user_by_email, principal_cache
+    from app.services.invalidation import USER, invalidation_bus
+
     async with async_session_maker() as db:
         existing = await get_user_by_email(db, email)
         if existing:
@@ -16,13 +30,77 @@ async def _create_admin(email: str, password: str) -> None:
             else:
                 # Upgrade to admin
                 existing.role = UserRole.ADMIN
+                await invalidation_bus.publish(db, USER, existing.id)
                 await db.commit()
+                principal_cache.invalidate(existing.id)
                 click.echo(f"User {email} upgraded to admin.")
                 return
 
         user = await create_user(db, email, password, role=UserRole.ADMIN)
         click.echo(f"Admin user created: {user.email}")
 
+async def _read_file(path: Path, chunk_size: int = 1 << 20) -> AsyncIterator[bytes]:
+    with path.open("rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+async def _import_tasks(email: str, path: Path, import_format: str) -> None:
+    from app.database import async_session_maker, set_rls_context
+    from app.services.auth import get_user_by_email
+    from app.services.task_import import ImportLimitExceededError, TaskImporter, iter_records
+
+    settings = _settings()
+    async with async_session_maker() as db:
+        user = await get_user_by_email(db, email)
+        if not user:
+            click.echo(f"Error: No user with email {email}.", err=True)
+            return
+
+        await set_rls_context(db, str(user.id))
+        importer = TaskImporter(
+            db,
+            user.id,
+            batch_size=settings.task_import_batch_size,
+            max_rows=settings.task_import_max_rows,
+        )
+        try:
+            imported = await importer.run(iter_records(_read_file(path), import_format))
+        except ImportLimitExceededError as exc:
+            await db.rollback()
+            click.echo(f"Error: {exc}. Nothing was imported.", err=True)
+            return
+        await db.commit()
+
+    click.echo(f"Imported {imported} tasks for {email}.")
+    if importer.rejected_count:
+        click.echo(f"Rejected {importer.rejected_count} rows:", err=True)
+        for rejection in importer.rejected:
+            click.echo(f"  line {rejection['line']}: {rejection['error']}", err=True)
+
+async def _purge_refresh_tokens(retention_seconds: float, batch_size: int) -> None:
+    from app.services.token_purge import RefreshTokenPurger
+
+    settings = _settings()
+    purger = RefreshTokenPurger(
+        interval_seconds=settings.refresh_token_purge_interval_seconds,
+        retention_seconds=retention_seconds,
+        batch_size=batch_size,
+        batch_pause_seconds=settings.refresh_token_purge_batch_pause_seconds,
+    )
+    deleted = await purger.purge()
+    click.echo(f"Purged {deleted} refresh tokens.")
+
+def available_cpus() -> int:
+    """CPUs this process may use: its affinity mask, capped by a cgroup v2 quota."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+    except (OSError, ValueError):
+        return cpus
+    if quota == "max":
+        return cpus
+    return max(1, min(cpus, math.ceil(int(quota) / int(period))))
+
 @click.group()
 def cli():
     """Task Manager CLI"""
@@ -39,5 +117,84 @@ def create_admin(email: str, password: str):
 
     asyncio.run(_create_admin(email, password))
 
+@cli.command()
+@click.option("--email", required=True, help="Email of the user who will own the tasks")
+@click.option(
+    "--file",
+    "path",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="NDJSON or CSV file of tasks",
+)
+@click.option(
+    "--format",
+    "import_format",
+    type=click.Choice(["ndjson", "csv"]),
+    help="Input format (default: from the file extension)",
+)
+def import_tasks(email: str, path: Path, import_format: str | None):
+    """Bulk-import tasks for a user via COPY."""
+    if import_format is None:
+        import_format = "csv" if path.suffix.lower() == ".csv" else "ndjson"
+
+    asyncio.run(_import_tasks(email, path, import_format))
+
+@cli.command()
+@click.option(
+    "--retention-seconds",
+    type=float,
+    default=lambda: _settings().refresh_token_purge_retention_seconds,
+    show_default="REFRESH_TOKEN_PURGE_RETENTION_SECONDS",
+    help="Keep tokens this long after they expire or are revoked",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=lambda: _settings().refresh_token_purge_batch_size,
+    show_default="REFRESH_TOKEN_PURGE_BATCH_SIZE",
+    help="Rows deleted per transaction",
+)
+def purge_refresh_tokens(retention_seconds: float, batch_size: int):
+    """Delete expired and revoked refresh tokens now."""
+    asyncio.run(_purge_refresh_tokens(retention_seconds, batch_size))
+
+@cli.command()
+@click.option("--host", default="0.0.0.0", show_default=True)
+@click.option("--port", type=int, default=8000, show_default=True)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=available_cpus,
+    show_default="one per available CPU",
+    help="Worker processes",
+)
+def serve(host: str, port: int, workers: int):
+    """Run the API in production: several workers on uvloop and httptools."""
+    import uvicorn
+
+    settings = _settings()
+    # Import the app up front so a broken build fails here rather than in
+    # every worker; a single worker serves this very instance
+    from app.main import app
+
+    replicas = len(settings.database_replica_urls_list)
+    per_worker = settings.db_pool_size + settings.db_max_overflow
+    click.echo(
+        f"Starting {workers} worker(s) on {host}:{port}; up to {workers * per_worker} "
+        f"primary connections (+{workers} invalidation listener(s)) and "
+        f"{workers * per_worker} per replica ({replicas} configured)."
+    )
+    uvicorn.run(
+        "app.main:app" if workers > 1 else app,
+        host=host,
+        port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        # Fail the worker instead of serving if startup (and warmup) breaks
+        lifespan="on",
+        proxy_headers=True,
+    )
+
 if __name__ == "__main__":
     cli()
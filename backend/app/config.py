@@ -8,13 +8,92 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 15
     refresh_token_expire_days: int = 7
+    # Window in which concurrent refreshes of the same token all receive its successor
+    refresh_token_reuse_grace_seconds: int = 30
+    # Keys the derivation of rotated refresh tokens. Kept apart from the JWT
+    # key so either can leak or rotate alone; when empty, a subkey labelled
+    # for this use is derived from the JWT key.
+    refresh_token_secret_key: str = ""
+    # Expired and revoked refresh tokens are deleted this long after they
+    # stop being usable, in throttled batches, by every worker's purge task
+    refresh_token_purge_retention_seconds: float = 86_400.0
+    refresh_token_purge_interval_seconds: float = 3_600.0
+    refresh_token_purge_batch_size: int = 1_000
+    refresh_token_purge_batch_pause_seconds: float = 0.1
+
     environment: str = "development"
     cors_origins: str = '["http://localhost:5173"]'
+    # How long browsers may cache a CORS preflight (Chromium caps this at 2h)
+    cors_max_age: int = 7200
+
+    # Connection pool. Only connections idle longer than the pre-ping threshold
+    # are pinged on checkout. Set the statement cache size to 0 behind
+    # PgBouncer in transaction mode.
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_recycle_seconds: int = 1800
+    db_pool_timeout_seconds: float = 10.0
+    db_pool_pre_ping_idle_seconds: float = 30.0
+    db_statement_cache_size: int = 100
+    db_echo: bool = False
+
+    # Startup warmup: connections each worker opens (and primes with the hot
+    # queries) on the primary and on every replica before it takes traffic
+    startup_warmup: bool = True
+    db_pool_warm_connections: int = 4
+
+    # Read replicas (JSON list of URLs; empty routes everything to the primary)
+    # and how long a user's reads stick to the primary after they write
+    database_replica_urls: str = "[]"
+    replica_sticky_seconds: float = 5.0
+    replica_sticky_max_entries: int = 100_000
+
+    # Outside production, responses carry X-DB-Statements / X-DB-Round-Trips
+    # and requests running more statements than this are logged (0 disables)
+    query_warn_statements: int = 20
+
+    # The admin user list counts matches on its first page, up to this many
+    admin_user_count_limit: int = 10_000
+
+    # Maximum operations accepted by POST /api/tasks/batch
+    task_batch_max_operations: int = 500
+
+    # Bulk import: rows per binary COPY batch and the per-import row cap
+    task_import_batch_size: int = 5_000
+    task_import_max_rows: int = 100_000
+
+    # Authenticated-principal cache; the TTL bounds how long a deactivated
+    # user can keep using an access token on a worker that missed invalidation
+    principal_cache_ttl_seconds: float = 5.0
+    principal_cache_max_entries: int = 10_000
+
+    # Verified access-token claims, held until each token expires so repeat
+    # requests skip the signature check
+    access_token_cache_max_entries: int = 10_000
+
+    # Cross-worker cache invalidation over LISTEN/NOTIFY; the listen
+    # connection is pinged this often so a dead one is noticed and replaced
+    invalidation_channel: str = "cache_invalidation"
+    invalidation_keepalive_seconds: float = 30.0
+    invalidation_reconnect_max_seconds: float = 30.0
+
+    # Argon2 hashing runs in a bounded pool ("thread" or "process"); requests
+    # beyond workers + queue size are rejected with 503
+    password_hash_executor: str = "thread"
+    password_hash_workers: int = 4
+    password_hash_queue_size: int = 32
+
+    # last_login_at updates are buffered in-process and written in batches
+    last_login_flush_interval_seconds: float = 5.0
 
     @property
     def cors_origins_list(self) -> list[str]:
         return json.loads(self.cors_origins)
 
+    @property
+    def database_replica_urls_list(self) -> list[str]:
+        return json.loads(self.database_replica_urls)
+
     class Config:
         env_file = ".env"
         extra = "ignore"
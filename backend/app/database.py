@@ -1,24 +1,251 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import event, text
+import itertools
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, SessionTransaction
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import event, exc, text
 from typing import AsyncGenerator
 
+from app.cache import TTLCache
 from app.config import get_settings
+from app.metrics import REGISTRY, Counter, Gauge, Histogram, LabeledHistogram, Metric
 
 settings = get_settings()
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.environment == "development",
-    pool_pre_ping=True,
-)
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_seconds = Histogram()
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.wait_seconds.observe(time.perf_counter() - start)
+
+# Instead of pool_pre_ping's round trip on every checkout, only ping
+# connections that sat idle long enough for a proxy or server to drop them.
+# Failures raise DisconnectionError, which makes the pool retry with a
+# fresh connection.
+def _record_checkin(dbapi_connection, connection_record):
+    connection_record.info["checked_in_at"] = time.monotonic()
+
+def _ping_if_idle(dialect, dbapi_connection, connection_record):
+    checked_in_at = connection_record.info.get("checked_in_at")
+    if checked_in_at is None:
+        return
+    if time.monotonic() - checked_in_at < settings.db_pool_pre_ping_idle_seconds:
+        return
+    try:
+        dialect.do_ping(dbapi_connection)
+    except Exception as e:
+        raise exc.DisconnectionError("Idle connection failed ping") from e
+
+def _create_engine(url: str) -> AsyncEngine:
+    new_engine = create_async_engine(
+        url,
+        echo=settings.db_echo,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        connect_args={
+            # asyncpg's own cache and SQLAlchemy's prepared-statement cache
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        },
+    )
+
+    def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        _ping_if_idle(new_engine.dialect, dbapi_connection, connection_record)
+
+    event.listen(new_engine.sync_engine, "checkin", _record_checkin)
+    event.listen(new_engine.sync_engine, "checkout", ping_if_idle)
+    return new_engine
+
+# Engines and session makers are built on first use, so importing this
+# module (e.g. for Base, or from a CLI command) never sets up a pool
+_engine: AsyncEngine | None = None
+_session_maker: async_sessionmaker[AsyncSession] | None = None
+
+def get_engine() -> AsyncEngine:
+    global _engine
+    if _engine is None:
+        _engine = _create_engine(settings.database_url)
+    return _engine
+
+def get_session_maker() -> async_sessionmaker[AsyncSession]:
+    global _session_maker
+    if _session_maker is None:
+        _session_maker = async_sessionmaker(get_engine(), class_=AsyncSession, expire_on_commit=False)
+    return _session_maker
+
+def async_session_maker() -> AsyncSession:
+    """A new session on the primary."""
+    return get_session_maker()()
+
+def pool_stats(pool_engine: AsyncEngine | None = None) -> dict:
+    # engine.dispose() swaps in a fresh pool, so look it up every time
+    pool = (pool_engine or get_engine()).pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # QueuePool counts overflow from -pool_size; clamp to what's in use
+        "overflow": max(pool.overflow(), 0),
+        "timeouts": pool.timeouts,
+        "wait_seconds": pool.wait_seconds.snapshot(),
+    }
+
+# Optional read replicas, used round-robin by read-only endpoints; None
+# until first use
+replica_engines: list[AsyncEngine] | None = None
+replica_session_makers: list[async_sessionmaker[AsyncSession]] | None = None
+_replica_counter = itertools.count()
+
+def get_replica_engines() -> list[AsyncEngine]:
+    global replica_engines
+    if replica_engines is None:
+        replica_engines = [_create_engine(url) for url in settings.database_replica_urls_list]
+    return replica_engines
+
+def get_replica_session_makers() -> list[async_sessionmaker[AsyncSession]]:
+    global replica_session_makers
+    if replica_session_makers is None:
+        replica_session_makers = [
+            async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            for engine in get_replica_engines()
+        ]
+    return replica_session_makers
 
-async_session_maker = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
+# Users who recently wrote read from the primary until replicas catch up.
+# Per worker, like the principal cache.
+recent_writers: TTLCache[UUID, bool] = TTLCache(
+    max_entries=settings.replica_sticky_max_entries,
+    ttl_seconds=settings.replica_sticky_seconds,
 )
 
+# Set when this worker may have missed other workers' writes
+_primary_only_until = 0.0
+
+def mark_recent_write(user_id: UUID) -> bool:
+    """Make the user's reads sticky; True if they weren't already."""
+    if not get_replica_session_makers():
+        return False
+    fresh = recent_writers.get(user_id) is None
+    recent_writers.set(user_id, True)
+    return fresh
+
+def pin_reads_to_primary(seconds: float) -> None:
+    global _primary_only_until
+    _primary_only_until = max(_primary_only_until, time.monotonic() + seconds)
+
+def replica_session_maker_for(user_id: UUID) -> async_sessionmaker[AsyncSession] | None:
+    """Pick a replica for this user's reads, or None to stay on the primary."""
+    replicas = get_replica_session_makers()
+    if not replicas or recent_writers.get(user_id) is not None:
+        return None
+    if _primary_only_until > time.monotonic():
+        return None
+    return replicas[next(_replica_counter) % len(replicas)]
+
+def _pool_metrics() -> Iterable[Metric]:
+    pools = [("primary", get_engine())] + [
+        (f"replica{index}", engine) for index, engine in enumerate(get_replica_engines())
+    ]
+    gauges = {
+        name: Gauge(f"db_pool_{name}", help, ["pool"])
+        for name, help in (
+            ("size", "Configured pool size"),
+            ("checked_out", "Connections currently checked out"),
+            ("overflow", "Overflow connections currently open"),
+        )
+    }
+    timeouts = Counter(
+        "db_pool_timeouts_total", "Checkouts that timed out waiting for a connection", ["pool"]
+    )
+    wait = LabeledHistogram(
+        "db_pool_wait_seconds", "Time spent waiting to check out a connection", ["pool"]
+    )
+    for label, pool_engine in pools:
+        stats = pool_stats(pool_engine)
+        for name, gauge in gauges.items():
+            gauge.set(label, value=stats[name])
+        timeouts.inc(label, amount=stats["timeouts"])
+        wait.add_series((label,), pool_engine.pool.wait_seconds)
+    return [*gauges.values(), timeouts, wait]
+
+REGISTRY.add_collector(_pool_metrics)
+
+@dataclass(slots=True)
+class QueryStats:
+    statements: int = 0
+    # Statements plus BEGIN / COMMIT / ROLLBACK, each a network round trip
+    round_trips: int = 0
+    seconds: float = 0.0
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+def begin_query_tracking() -> tuple[QueryStats, Token]:
+    """Count statements executed (on any engine) in the current context.
+
+    SQLAlchemy's async greenlets inherit the caller's context, so statements
+    run by awaited session calls are attributed to the enclosing request.
+    Pass the token to end_query_tracking() when done.
+    """
+    stats = QueryStats()
+    return stats, _query_stats.set(stats)
+
+def end_query_tracking(token: Token) -> None:
+    _query_stats.reset(token)
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats, token = begin_query_tracking()
+    try:
+        yield stats
+    finally:
+        end_query_tracking(token)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _query_stats.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _query_stats.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+    stats.statements += 1
+    stats.round_trips += 1
+    stats.seconds += time.perf_counter() - started.pop()
+
+@event.listens_for(Engine, "begin")
+@event.listens_for(Engine, "commit")
+@event.listens_for(Engine, "rollback")
+def _count_transaction_round_trip(conn):
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.round_trips += 1
+
 class Base(DeclarativeBase):
     pass
 
@@ -29,5 +256,32 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         finally:
             await session.close()
 
+_SET_RLS_CONTEXT = text("SELECT set_config('app.current_user_id', :user_id, true)")
+_RLS_USER_ID = "rls_user_id"
+_RLS_APPLIED = "rls_applied"
+
+@event.listens_for(Session, "after_begin")
+def _apply_rls_context(session: Session, transaction: SessionTransaction, connection: Connection):
+    # Fires when a transaction first needs a connection, right before its
+    # first statement, so the context follows the session across commits
+    if transaction.nested:
+        return
+    user_id = session.info.get(_RLS_USER_ID)
+    if user_id is not None:
+        connection.execute(_SET_RLS_CONTEXT, {"user_id": user_id})
+    session.info[_RLS_APPLIED] = (connection, user_id)
+
 async def set_rls_context(session: AsyncSession, user_id: str) -> None:
-    await session.execute(text(f"SET LOCAL app.current_user_id = '{user_id}'"))
+    """Scope the session's queries to user_id for RLS.
+
+    The id is bound into set_config(..., is_local => true) by the after_begin
+    hook at the start of each transaction that actually runs a statement, so
+    a request that never touches this session (e.g. a replica read) pays
+    nothing. Only a transaction already under way is updated immediately.
+    """
+    user_id = str(user_id)
+    session.info[_RLS_USER_ID] = user_id
+    applied = session.info.get(_RLS_APPLIED)
+    if applied is not None and not applied[0].closed and applied[1] != user_id:
+        await session.execute(_SET_RLS_CONTEXT, {"user_id": user_id})
+        session.info[_RLS_APPLIED] = (applied[0], user_id)
@@ -1,27 +1,55 @@
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.responses import ORJSONResponse
 from app.config import get_settings
+from app.database import pool_stats
+from app.metrics import REGISTRY
+from app.middleware.metrics import MetricsMiddleware
 from app.middleware.security import SecurityHeadersMiddleware
+from app.services.hashing import HashingPoolSaturatedError, hashing_pool
+from app.services.invalidation import invalidation_bus
+from app.services.login_buffer import last_login_buffer
+from app.services.token_purge import refresh_token_purger
+from app.services.warmup import warm_up
 
 settings = get_settings()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-    # Startup
+    # Startup; uvicorn only hands a worker requests once this completes
+    if settings.startup_warmup:
+        await warm_up()
+    invalidation_bus.start()
+    last_login_buffer.start()
+    refresh_token_purger.start()
     yield
     # Shutdown
+    await refresh_token_purger.stop()
+    await invalidation_bus.stop()
+    await last_login_buffer.stop()
+    hashing_pool.shutdown()
 
 app = FastAPI(
     title="Task Manager API",
     description="Multi-tenant task management API",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+@app.exception_handler(HashingPoolSaturatedError)
+async def hashing_pool_saturated_handler(request: Request, exc: HashingPoolSaturatedError):
+    return ORJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Authentication is temporarily overloaded, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
 # Security headers middleware
 app.add_middleware(SecurityHeadersMiddleware)
 
@@ -32,6 +60,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=settings.cors_max_age,
+)
+
+# Request metrics; added last so it wraps (and times) every other middleware.
+# Outside production it also reports each request's SQL cost.
+app.add_middleware(
+    MetricsMiddleware,
+    expose_queries=settings.environment != "production",
+    warn_statements=settings.query_warn_statements if settings.environment != "production" else 0,
 )
 
 from app.api.auth import router as auth_router
@@ -44,4 +81,15 @@ app.include_router(admin_router, prefix="/api")
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    stats = pool_stats()
+    return {
+        "status": "healthy",
+        "db_pool": {
+            name: stats[name] for name in ("size", "checked_out", "overflow", "timeouts")
+        },
+    }
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # Prometheus text format; per worker process, so scrape each worker
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
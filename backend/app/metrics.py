@@ -0,0 +1,165 @@
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# Seconds; covers an idle pool (sub-millisecond) up to a checkout timeout
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Fixed-bucket histogram with cumulative (Prometheus-style) snapshots.
+
+    Not thread-safe; observe from the event loop thread only.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        # Upper bounds are inclusive, as in Prometheus "le" buckets
+        self._counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> dict:
+        cumulative: dict[str, int] = {}
+        running = 0
+        for bound, count in zip(self.buckets, self._counts):
+            running += count
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = self.count
+        return {"buckets": cumulative, "count": self.count, "sum": self.sum}
+
+    def reset(self) -> None:
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+def timed(fn: Callable[..., T], *args: Any) -> tuple[T, float]:
+    """Call fn and return (result, seconds); picklable for process pools."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self.samples()
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for values, value in self._values.items():
+            yield f"{self.name}{_labels(self.label_names, values)} {value}"
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *label_values: str, value: float) -> None:
+        self._values[label_values] = value
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+class LabeledHistogram(Metric):
+    """One Histogram per label combination, created on first use."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple[str, ...], Histogram] = {}
+
+    def labels(self, *label_values: str) -> Histogram:
+        histogram = self._series.get(label_values)
+        if histogram is None:
+            histogram = self._series[label_values] = Histogram(self.buckets)
+        return histogram
+
+    def add_series(self, label_values: tuple[str, ...], histogram: Histogram) -> None:
+        # Expose a histogram owned elsewhere (e.g. a connection pool's)
+        self._series[label_values] = histogram
+
+    def samples(self) -> Iterator[str]:
+        for values, histogram in self._series.items():
+            running = 0
+            for bound, count in zip(histogram.buckets, histogram._counts):
+                running += count
+                le = _labels(self.label_names, values, f'le="{bound}"')
+                yield f"{self.name}_bucket{le} {running}"
+            le = _labels(self.label_names, values, 'le="+Inf"')
+            yield f"{self.name}_bucket{le} {histogram.count}"
+            labels = _labels(self.label_names, values)
+            yield f"{self.name}_sum{labels} {histogram.sum}"
+            yield f"{self.name}_count{labels} {histogram.count}"
+
+M = TypeVar("M", bound=Metric)
+
+class Registry:
+    """Process-local metrics rendered in the Prometheus text format.
+
+    Collectors are called at scrape time for values that are cheaper to read
+    on demand (pool sizes) than to keep updated.
+    """
+
+    def __init__(self):
+        self._metrics: list[Metric] = []
+        self._collectors: list[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Metric]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
@@ -0,0 +1,137 @@
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database import begin_query_tracking, end_query_tracking
+from app.metrics import REGISTRY, Counter, Gauge, LabeledHistogram
+
+# Statements per request; anything past 21 is an N+1 worth looking at
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+# Set on responses outside production so developers (and tests) can see what
+# a request cost the database
+STATEMENTS_HEADER = "X-DB-Statements"
+ROUND_TRIPS_HEADER = "X-DB-Round-Trips"
+
+logger = logging.getLogger(__name__)
+
+# Requests that matched no route share one label so scanners probing random
+# paths cannot blow up the series count
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status",
+    ["method", "route", "status"],
+))
+REQUEST_SECONDS = REGISTRY.register(LabeledHistogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ["method", "route"]
+))
+REQUEST_QUERIES = REGISTRY.register(LabeledHistogram(
+    "http_request_db_queries", "SQL statements executed per request", ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+))
+REQUEST_DB_SECONDS = REGISTRY.register(LabeledHistogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request", ["route"]
+))
+
+_in_progress = 0
+
+def _in_progress_metrics() -> list[Gauge]:
+    # A plain int on the hot path; wrapped in a Gauge only at scrape time
+    gauge = Gauge("http_requests_in_progress", "HTTP requests currently being served")
+    gauge.set(value=_in_progress)
+    return [gauge]
+
+REGISTRY.add_collector(_in_progress_metrics)
+
+def _route_template(scope: Scope) -> str:
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return UNMATCHED_ROUTE
+    # Newer FastAPI leaves the router-local route (without the include_router
+    # prefix) in the scope; restore the prefix from the real path's leading
+    # segments. Prefixes are literals, so this never leaks parameter values.
+    extra = scope["path"].count("/") - template.count("/")
+    if extra > 0:
+        template = "/".join(scope["path"].split("/")[: extra + 1]) + template
+    return template
+
+class _RouteSeries:
+    __slots__ = ("method", "template", "seconds", "queries", "db_seconds")
+
+    def __init__(self, method: str, template: str):
+        self.method = method
+        self.template = template
+        self.seconds = REQUEST_SECONDS.labels(method, template)
+        self.queries = REQUEST_QUERIES.labels(template)
+        self.db_seconds = REQUEST_DB_SECONDS.labels(template)
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route request metrics.
+
+    Labels use the matched route's path template (``/api/tasks/{task_id}``),
+    which the router leaves in the scope, never the raw path. Series are
+    resolved once per (method, route) so the hot path is a dict lookup plus
+    a few histogram increments.
+
+    With ``expose_queries`` the request's statement and round-trip counts are
+    added as response headers, and requests running more than
+    ``warn_statements`` statements (usually an N+1) are logged.
+    """
+
+    def __init__(self, app: ASGIApp, expose_queries: bool = False, warn_statements: int = 0):
+        self.app = app
+        self.expose_queries = expose_queries
+        self.warn_statements = warn_statements
+        self._series: dict[tuple[str, int], _RouteSeries] = {}
+
+    def _series_for(self, scope: Scope) -> _RouteSeries:
+        # Routes live as long as the app and are not hashable; key by identity
+        key = (scope["method"], id(scope.get("route")))
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _RouteSeries(scope["method"], _route_template(scope))
+        return series
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        global _in_progress
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        queries, token = begin_query_tracking()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.expose_queries:
+                    # Streaming bodies may run more statements after this
+                    headers = MutableHeaders(scope=message)
+                    headers.append(STATEMENTS_HEADER, str(queries.statements))
+                    headers.append(ROUND_TRIPS_HEADER, str(queries.round_trips))
+            await send(message)
+
+        _in_progress += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            end_query_tracking(token)
+            _in_progress -= 1
+
+            series = self._series_for(scope)
+            REQUESTS.inc(series.method, series.template, str(status))
+            series.seconds.observe(elapsed)
+            series.queries.observe(queries.statements)
+            series.db_seconds.observe(queries.seconds)
+            if self.warn_statements and queries.statements > self.warn_statements:
+                logger.warning(
+                    "%s %s ran %d SQL statements (%d round trips); possible N+1",
+                    series.method, series.template, queries.statements, queries.round_trips,
+                )
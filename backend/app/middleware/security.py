@@ -1,33 +1,56 @@
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next) -> Response:
-        response = await call_next(request)
-
-        # Content Security Policy
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline'; "
-            "style-src 'self' 'unsafe-inline'; "
-            "img-src 'self' data:; "
-            "font-src 'self'; "
-            "connect-src 'self'"
-        )
-
-        # HTTP Strict Transport Security
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-
-        # Prevent clickjacking
-        response.headers["X-Frame-Options"] = "DENY"
-
-        # Prevent MIME type sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
-
-        # Referrer policy
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-
-        # Permissions policy
-        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
-
-        return response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+SECURITY_HEADERS: dict[str, str] = {
+    # Content Security Policy
+    "Content-Security-Policy": (
+        "default-src 'self'; "
+        "script-src 'self' 'unsafe-inline'; "
+        "style-src 'self' 'unsafe-inline'; "
+        "img-src 'self' data:; "
+        "font-src 'self'; "
+        "connect-src 'self'"
+    ),
+    # HTTP Strict Transport Security
+    "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+    # Prevent clickjacking
+    "X-Frame-Options": "DENY",
+    # Prevent MIME type sniffing
+    "X-Content-Type-Options": "nosniff",
+    # Referrer policy
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    # Permissions policy
+    "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
+}
+
+class SecurityHeadersMiddleware:
+    """Pure ASGI middleware appending pre-encoded security headers.
+
+    Unlike BaseHTTPMiddleware it does not wrap the request in an extra task
+    or re-stream the body; it only rewrites the http.response.start message.
+    """
+
+    def __init__(self, app: ASGIApp, headers: dict[str, str] | None = None):
+        self.app = app
+        self.raw_headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in (headers or SECURITY_HEADERS).items()
+        ]
+        self.header_names = frozenset(name for name, _ in self.raw_headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Our values win over any the endpoint set, as before
+                headers = [
+                    header for header in message.get("headers", ())
+                    if header[0].lower() not in self.header_names
+                ]
+                headers.extend(self.raw_headers)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -1,5 +1,6 @@
 from app.models.user import User, UserRole
 from app.models.task import Task
 from app.models.refresh_token import RefreshToken
+from app.models.user_task_stats import UserTaskStats
 
-__all__ = ["User", "UserRole", "Task", "RefreshToken"]
+__all__ = ["User", "UserRole", "Task", "RefreshToken", "UserTaskStats"]
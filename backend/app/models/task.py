@@ -1,6 +1,6 @@
-from sqlalchemy import String, Boolean, Text, DateTime, ForeignKey, func
+from sqlalchemy import Column, Computed, String, Boolean, Text, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
@@ -10,8 +10,20 @@ from app.database import Base
 if TYPE_CHECKING:
     from app.models.user import User
 
+# Text search configuration for the search_vector column and its queries
+SEARCH_CONFIG = "english"
+
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_user_created_id", "user_id", "created_at", "id"),
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    # search_vector is part of the table but not mapped: ORM loads and
+    # INSERT ... RETURNING never carry it, and queries use Task.search_vector.
+    # Eager defaults fetch created_at/updated_at through RETURNING on INSERT
+    # and UPDATE, so writes need no refresh afterwards.
+    __mapper_args__ = {"exclude_properties": ["search_vector"], "eager_defaults": True}
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -29,4 +41,14 @@ class Task(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
+    # Title matches (weight A) rank above description matches (weight B)
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', title), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+    )
+
     user: Mapped["User"] = relationship("User", back_populates="tasks")
@@ -0,0 +1,96 @@
+import uuid
+
+from sqlalchemy import DDL, BigInteger, ForeignKey, Integer, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.models.task import Task
+
+
+class UserTaskStats(Base):
+    __tablename__ = "user_task_stats"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    total_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    completed_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Bumped by every statement that writes the user's tasks; drives list ETags
+    version: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+    @property
+    def open_count(self) -> int:
+        return self.total_count - self.completed_count
+
+# Counters are maintained by statement-level triggers on tasks so that every
+# writer (ORM, bulk statements, COPY) keeps them correct. Keep in sync with
+# the latest alembic revision defining tasks_maintain_user_stats().
+MAINTAIN_STATS_FUNCTION = DDL("""
+CREATE OR REPLACE FUNCTION tasks_maintain_user_stats() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO user_task_stats AS s (user_id, total_count, completed_count, version)
+        SELECT user_id, count(*), count(*) FILTER (WHERE is_completed), 1
+        FROM new_rows GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE
+        SET total_count = s.total_count + EXCLUDED.total_count,
+            completed_count = s.completed_count + EXCLUDED.completed_count,
+            version = s.version + 1;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE user_task_stats AS s
+        SET total_count = s.total_count - d.total_count,
+            completed_count = s.completed_count - d.completed_count,
+            version = s.version + 1
+        FROM (
+            SELECT user_id, count(*) AS total_count,
+                   count(*) FILTER (WHERE is_completed) AS completed_count
+            FROM old_rows GROUP BY user_id
+        ) AS d
+        WHERE s.user_id = d.user_id;
+    ELSE
+        -- Every updated user gets a version bump, even when counters are unchanged
+        INSERT INTO user_task_stats AS s (user_id, total_count, completed_count, version)
+        SELECT user_id, sum(total_delta), sum(completed_delta), 1
+        FROM (
+            SELECT user_id, -1 AS total_delta, -is_completed::int AS completed_delta FROM old_rows
+            UNION ALL
+            SELECT user_id, 1, is_completed::int FROM new_rows
+        ) AS changes
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE
+        SET total_count = s.total_count + EXCLUDED.total_count,
+            completed_count = s.completed_count + EXCLUDED.completed_count,
+            version = s.version + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+""")
+
+STATS_TRIGGERS = [
+    DDL(
+        "CREATE TRIGGER tasks_stats_insert AFTER INSERT ON tasks "
+        "REFERENCING NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION tasks_maintain_user_stats()"
+    ),
+    DDL(
+        "CREATE TRIGGER tasks_stats_update AFTER UPDATE ON tasks "
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION tasks_maintain_user_stats()"
+    ),
+    DDL(
+        "CREATE TRIGGER tasks_stats_delete AFTER DELETE ON tasks "
+        "REFERENCING OLD TABLE AS old_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION tasks_maintain_user_stats()"
+    ),
+]
+
+event.listen(Task.__table__, "after_create", MAINTAIN_STATS_FUNCTION)
+for trigger in STATS_TRIGGERS:
+    event.listen(Task.__table__, "after_create", trigger)
+event.listen(
+    Task.__table__,
+    "after_drop",
+    DDL("DROP FUNCTION IF EXISTS tasks_maintain_user_stats()"),
+)
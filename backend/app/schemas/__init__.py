@@ -10,6 +10,10 @@ from app.schemas.task import (
     TaskUpdate,
     TaskResponse,
     TaskListResponse,
+    TaskStatsResponse,
+    TaskBatchRequest,
+    TaskBatchResponse,
+    TaskImportResponse,
 )
 
 __all__ = [
@@ -22,4 +26,8 @@ __all__ = [
     "TaskUpdate",
     "TaskResponse",
     "TaskListResponse",
+    "TaskStatsResponse",
+    "TaskBatchRequest",
+    "TaskBatchResponse",
+    "TaskImportResponse",
 ]
@@ -18,7 +18,62 @@ class AdminUserResponse(BaseModel):
 
 class AdminUserListResponse(BaseModel):
     users: list[AdminUserResponse]
-    total: int
+    # Matching users, counted on the first page only and at most up to the
+    # cap; total_capped means there are more
+    total: int | None
+    total_capped: bool
+    next_cursor: str | None
 
 class UserStatusUpdate(BaseModel):
     is_active: bool
+
+class CacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_entries: int
+
+class HashingPoolStatsResponse(BaseModel):
+    workers: int
+    capacity: int
+    in_flight: int
+    rejected: int
+
+class LastLoginBufferStatsResponse(BaseModel):
+    pending: int
+    flushed: int
+
+class RefreshTokenPurgeStatsResponse(BaseModel):
+    purged: int
+    runs: int
+    last_run_at: datetime | None
+
+class HistogramResponse(BaseModel):
+    # Cumulative counts keyed by upper bound in seconds, ending with "+Inf"
+    buckets: dict[str, int]
+    count: int
+    sum: float
+
+class DbPoolStatsResponse(BaseModel):
+    size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    timeouts: int
+    wait_seconds: HistogramResponse
+
+class InvalidationBusStatsResponse(BaseModel):
+    connected: bool
+    received: int
+    flushes: int
+    reconnects: int
+
+class RuntimeStatsResponse(BaseModel):
+    principal_cache: CacheStatsResponse
+    access_token_cache: CacheStatsResponse
+    hashing_pool: HashingPoolStatsResponse
+    last_login_buffer: LastLoginBufferStatsResponse
+    refresh_token_purge: RefreshTokenPurgeStatsResponse
+    invalidation_bus: InvalidationBusStatsResponse
+    db_pool: DbPoolStatsResponse
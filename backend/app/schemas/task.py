@@ -1,7 +1,10 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Annotated, Literal, Union
 from uuid import UUID
 
+from app.config import get_settings
+
 class TaskCreate(BaseModel):
     title: str = Field(min_length=1, max_length=255)
     description: str | None = None
@@ -25,3 +28,68 @@ class TaskResponse(BaseModel):
 class TaskListResponse(BaseModel):
     tasks: list[TaskResponse]
     total: int
+    next_cursor: str | None = None
+
+class TaskSearchResponse(BaseModel):
+    tasks: list[TaskResponse]
+    next_cursor: str | None = None
+
+class TaskStatsResponse(BaseModel):
+    total: int
+    completed: int
+    open: int
+
+class TaskFilter(BaseModel):
+    is_completed: bool | None = None
+
+class TaskBatchCreate(TaskCreate):
+    op: Literal["create"]
+
+class TaskBatchUpdate(TaskUpdate):
+    op: Literal["update"]
+    id: UUID
+
+class TaskBatchDelete(BaseModel):
+    op: Literal["delete"]
+    id: UUID
+
+class TaskBatchUpdateWhere(BaseModel):
+    op: Literal["update_where"]
+    where: TaskFilter = Field(default_factory=TaskFilter)
+    set: TaskUpdate
+
+class TaskBatchDeleteWhere(BaseModel):
+    op: Literal["delete_where"]
+    where: TaskFilter = Field(default_factory=TaskFilter)
+
+TaskBatchOperation = Annotated[
+    Union[TaskBatchCreate, TaskBatchUpdate, TaskBatchDelete, TaskBatchUpdateWhere, TaskBatchDeleteWhere],
+    Field(discriminator="op"),
+]
+
+class TaskBatchRequest(BaseModel):
+    # The length is checked as items are read, so an oversized batch is
+    # rejected before the rest of it is validated
+    operations: list[TaskBatchOperation] = Field(
+        min_length=1, max_length=get_settings().task_batch_max_operations
+    )
+
+class TaskBatchResult(BaseModel):
+    index: int
+    op: str
+    status: Literal["ok", "not_found"]
+    id: UUID | None = None
+    task: TaskResponse | None = None
+    affected: int | None = None
+
+class TaskBatchResponse(BaseModel):
+    results: list[TaskBatchResult]
+
+class TaskImportRejection(BaseModel):
+    line: int
+    error: str
+
+class TaskImportResponse(BaseModel):
+    imported: int
+    rejected_count: int
+    rejected: list[TaskImportRejection]
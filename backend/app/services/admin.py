@@ -1,9 +1,40 @@
+from datetime import datetime
 from uuid import UUID
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
 
-from app.models.user import User
-from app.models.task import Task
+from sqlalchemy import ColumnElement, func, literal, select, true, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.user import User, UserRole
+from app.models.user_task_stats import UserTaskStats
+from app.services.auth import principal_cache
+from app.services.invalidation import USER, invalidation_bus
+from app.services.pagination import encode_cursor
+
+
+def _user_to_dict(user: User, task_count: int) -> dict:
+    return {
+        "id": user.id,
+        "email": user.email,
+        "role": user.role,
+        "is_active": user.is_active,
+        "created_at": user.created_at,
+        "last_login_at": user.last_login_at,
+        "task_count": task_count,
+    }
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _task_count(user_id: ColumnElement[UUID]) -> ColumnElement[int]:
+    # Task counts come from the trigger-maintained user_task_stats table; a
+    # user without a row has no tasks
+    return func.coalesce(
+        select(UserTaskStats.total_count)
+        .where(UserTaskStats.user_id == user_id)
+        .scalar_subquery(),
+        0,
+    )
 
 class AdminService:
     def __init__(self, db: AsyncSession):
@@ -12,93 +43,94 @@ class AdminService:
     async def list_users(
         self,
         limit: int = 50,
-        offset: int = 0,
-    ) -> tuple[list[dict], int]:
-        # Subquery for task count
-        task_count_subq = (
-            select(Task.user_id, func.count(Task.id).label("task_count"))
-            .group_by(Task.user_id)
-            .subquery()
+        cursor: tuple[datetime, UUID] | None = None,
+        email: str | None = None,
+        is_active: bool | None = None,
+        role: UserRole | None = None,
+        count_limit: int = 10_000,
+    ) -> tuple[list[dict], int | None, str | None]:
+        """One page of users, newest first, in a single statement.
+
+        The first page (no cursor) also counts matching users, but stops
+        counting past ``count_limit``; later pages return None for it.
+        """
+        criteria = []
+        if email:
+            # Served by the trigram index for prefixes and substrings alike
+            criteria.append(User.email.ilike(f"%{_escape_like(email)}%", escape="\\"))
+        if is_active is not None:
+            criteria.append(User.is_active == is_active)
+        if role is not None:
+            criteria.append(User.role == role)
+
+        page_query = select(User).where(*criteria)
+        if cursor is not None:
+            page_query = page_query.where(tuple_(User.created_at, User.id) < tuple_(*cursor))
+        # Fetch one extra row to learn whether another page exists
+        page = (
+            page_query.order_by(User.created_at.desc(), User.id.desc())
+            .limit(limit + 1)
+            .subquery("page")
         )
+        user = aliased(User, page)
+
+        # LATERAL runs once per row of the page, never over the whole table
+        stats = (
+            select(UserTaskStats.total_count)
+            .where(UserTaskStats.user_id == user.id)
+            .lateral("stats")
+        )
+        columns = [user, func.coalesce(stats.c.total_count, 0)]
+        if cursor is None:
+            matching = select(literal(1)).select_from(User).where(*criteria).limit(count_limit + 1)
+            columns.append(select(func.count()).select_from(matching.subquery()).scalar_subquery())
 
-        # Main query joining users with task counts
         query = (
-            select(User, func.coalesce(task_count_subq.c.task_count, 0).label("task_count"))
-            .outerjoin(task_count_subq, User.id == task_count_subq.c.user_id)
-            .order_by(User.created_at.desc())
-            .limit(limit)
-            .offset(offset)
+            select(*columns)
+            .select_from(page)
+            .outerjoin(stats, true())
+            .order_by(user.created_at.desc(), user.id.desc())
         )
+        rows = (await self.db.execute(query)).all()
+
+        total = None
+        if cursor is None:
+            # An empty first page means nothing matched
+            total = rows[0][2] if rows else 0
 
-        result = await self.db.execute(query)
-        rows = result.all()
-
-        users = []
-        for row in rows:
-            user = row[0]
-            task_count = row[1]
-            users.append({
-                "id": user.id,
-                "email": user.email,
-                "role": user.role,
-                "is_active": user.is_active,
-                "created_at": user.created_at,
-                "last_login_at": user.last_login_at,
-                "task_count": task_count,
-            })
-
-        # Total count
-        count_result = await self.db.execute(select(func.count(User.id)))
-        total = count_result.scalar() or 0
-
-        return users, total
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][0].created_at, rows[-1][0].id)
+
+        return [_user_to_dict(row[0], row[1]) for row in rows], total, next_cursor
 
     async def get_user(self, user_id: UUID) -> dict | None:
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        result = await self.db.execute(select(User, _task_count(User.id)).where(User.id == user_id))
+        row = result.one_or_none()
 
-        if not user:
+        if not row:
             return None
 
-        # Get task count
-        count_result = await self.db.execute(
-            select(func.count(Task.id)).where(Task.user_id == user_id)
-        )
-        task_count = count_result.scalar() or 0
-
-        return {
-            "id": user.id,
-            "email": user.email,
-            "role": user.role,
-            "is_active": user.is_active,
-            "created_at": user.created_at,
-            "last_login_at": user.last_login_at,
-            "task_count": task_count,
-        }
+        return _user_to_dict(row[0], row[1])
 
     async def update_user_status(self, user_id: UUID, is_active: bool) -> dict | None:
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        # UPDATE ... RETURNING hands back the row and its task count at once
+        result = await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(is_active=is_active)
+            .returning(User, _task_count(User.id))
+        )
+        row = result.one_or_none()
 
-        if not user:
+        if not row:
             return None
 
-        user.is_active = is_active
+        updated = _user_to_dict(row[0], row[1])
+        # Other workers evict their cached principal once this commits
+        await invalidation_bus.publish(self.db, USER, user_id)
         await self.db.commit()
-        await self.db.refresh(user)
+        principal_cache.invalidate(user_id)
 
-        # Get task count
-        count_result = await self.db.execute(
-            select(func.count(Task.id)).where(Task.user_id == user_id)
-        )
-        task_count = count_result.scalar() or 0
-
-        return {
-            "id": user.id,
-            "email": user.email,
-            "role": user.role,
-            "is_active": user.is_active,
-            "created_at": user.created_at,
-            "last_login_at": user.last_login_at,
-            "task_count": task_count,
-        }
+        return updated
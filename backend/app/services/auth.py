@@ -1,52 +1,137 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any
+import base64
 import hashlib
+import hmac
 import secrets
+import time
 from uuid import UUID
 
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import DateTime, LargeBinary, and_, exists, select, update, insert, literal, or_, func
 
+from app.cache import TTLCache
 from app.config import get_settings
+from app.metrics import REGISTRY, LabeledHistogram, timed
 from app.models.user import User, UserRole
 from app.models.refresh_token import RefreshToken
+from app.services.hashing import hashing_pool
+from app.services.login_buffer import last_login_buffer
 
 settings = get_settings()
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
+PASSWORD_HASH_SECONDS = REGISTRY.register(LabeledHistogram(
+    "password_hash_duration_seconds",
+    "Argon2 hash/verify time inside the hashing pool (excludes queueing)",
+    ["operation"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+))
+JWT_SECONDS = REGISTRY.register(LabeledHistogram(
+    "jwt_duration_seconds",
+    "Access token encode/decode time",
+    ["operation"],
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005),
+))
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    id: UUID
+    email: str
+    role: UserRole
+    is_active: bool
+
+principal_cache: TTLCache[UUID, Principal] = TTLCache(
+    max_entries=settings.principal_cache_max_entries,
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+)
+
+# Claims of access tokens whose signature already checked out, keyed by a
+# digest of the token and held until the token's own exp. Failed decodes are
+# never stored, so a bad token is re-verified (and rejected) every time.
+verified_token_cache: TTLCache[bytes, dict[str, Any]] = TTLCache(
+    max_entries=settings.access_token_cache_max_entries,
+    ttl_seconds=settings.access_token_expire_minutes * 60,
+)
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+async def hash_password_async(password: str) -> str:
+    hashed, seconds = await hashing_pool.run(timed, hash_password, password)
+    PASSWORD_HASH_SECONDS.labels("hash").observe(seconds)
+    return hashed
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    valid, seconds = await hashing_pool.run(timed, verify_password, plain_password, hashed_password)
+    PASSWORD_HASH_SECONDS.labels("verify").observe(seconds)
+    return valid
+
 def create_access_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
         expires_delta or timedelta(minutes=settings.access_token_expire_minutes)
     )
     to_encode.update({"exp": expire, "iat": datetime.now(timezone.utc)})
-    return jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    start = time.perf_counter()
+    token = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    JWT_SECONDS.labels("encode").observe(time.perf_counter() - start)
+    return token
 
 def decode_access_token(token: str) -> dict[str, Any] | None:
+    """Verify and decode an access token; the returned claims are shared, don't mutate them."""
+    start = time.perf_counter()
+    key = hashlib.blake2b(token.encode(), digest_size=32).digest()
+    payload = verified_token_cache.get(key)
+    if payload is not None:
+        JWT_SECONDS.labels("decode_cached").observe(time.perf_counter() - start)
+        return payload
     try:
         payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-        return payload
     except JWTError:
         return None
+    finally:
+        JWT_SECONDS.labels("decode").observe(time.perf_counter() - start)
+    # exp is a required claim of our tokens, but don't cache one that lacks it
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        verified_token_cache.set(key, payload, ttl_seconds=exp - time.time())
+    return payload
 
 def generate_refresh_token() -> str:
     return secrets.token_urlsafe(32)
 
-def hash_refresh_token(token: str) -> str:
-    return hashlib.sha256(token.encode()).hexdigest()
+def hash_refresh_token(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+def _refresh_rotation_key() -> bytes:
+    if settings.refresh_token_secret_key:
+        return settings.refresh_token_secret_key.encode()
+    # Labelled subkey, so the JWT signing key itself never keys this HMAC
+    return hmac.new(
+        settings.jwt_secret_key.encode(), b"taskmanager refresh-token rotation v1", hashlib.sha256
+    ).digest()
+
+REFRESH_ROTATION_KEY = _refresh_rotation_key()
+
+def derive_successor_refresh_token(token: str) -> str:
+    # Deterministic so every concurrent rotation of one token yields the same
+    # successor without the plaintext ever being stored
+    digest = hmac.new(REFRESH_ROTATION_KEY, b"refresh-rotation:" + token.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode().rstrip("=")
 
 async def create_user(db: AsyncSession, email: str, password: str, role: UserRole = UserRole.USER) -> User:
     user = User(
         email=email.lower(),
-        password_hash=hash_password(password),
+        password_hash=await hash_password_async(password),
         role=role,
     )
     db.add(user)
@@ -62,19 +147,35 @@ async def get_user_by_id(db: AsyncSession, user_id: UUID) -> User | None:
     result = await db.execute(select(User).where(User.id == user_id))
     return result.scalar_one_or_none()
 
+async def get_principal(db: AsyncSession, user_id: UUID) -> Principal | None:
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    result = await db.execute(
+        select(User.id, User.email, User.role, User.is_active).where(User.id == user_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    principal = Principal(id=row.id, email=row.email, role=row.role, is_active=row.is_active)
+    principal_cache.set(user_id, principal)
+    return principal
+
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> User | None:
     user = await get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    if not await verify_password_async(password, user.password_hash):
         return None
     return user
 
 async def update_last_login(db: AsyncSession, user: User) -> None:
-    await db.execute(
-        update(User).where(User.id == user.id).values(last_login_at=datetime.now(timezone.utc))
-    )
-    await db.commit()
+    now = datetime.now(timezone.utc)
+    last_login_buffer.record(user.id, now)
+    # Reflect the login in the response without dirtying the session
+    set_committed_value(user, "last_login_at", now)
 
 async def create_refresh_token_record(
     db: AsyncSession, user_id: UUID, token: str
@@ -99,20 +200,93 @@ async def validate_refresh_token(db: AsyncSession, token: str) -> RefreshToken |
     )
     return result.scalar_one_or_none()
 
+async def rotate_refresh_token(db: AsyncSession, token: str) -> tuple[User, str] | None:
+    """Validate, revoke and replace a refresh token in a single statement.
+
+    Returns the active owner and the successor token, or None. A token that
+    was rotated less than refresh_token_reuse_grace_seconds ago is accepted
+    again and yields the same successor, so tabs refreshing concurrently do
+    not fail or insert duplicate rows, unless that successor has itself been
+    revoked or rotated since.
+    """
+    new_token = derive_successor_refresh_token(token)
+    now = func.now()
+    grace = timedelta(seconds=settings.refresh_token_reuse_grace_seconds)
+    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
+
+    # The row lock taken here serializes concurrent rotations of one token;
+    # revoked_at == now() is only true for the transaction that revoked it.
+    # Expiry is pulled in to the end of the grace window, which is also what
+    # makes the rotated row eligible for the purge.
+    revoked_at = func.coalesce(RefreshToken.revoked_at, now)
+    # A successor the rotating transaction hasn't committed yet is invisible
+    # here, so reuse is refused only when it is seen to be dead (logged out)
+    successor = aliased(RefreshToken)
+    successor_dead = exists().where(
+        successor.token_hash == hash_refresh_token(new_token),
+        or_(successor.revoked_at.is_not(None), successor.expires_at <= now),
+    )
+    old_token = (
+        update(RefreshToken)
+        .where(RefreshToken.token_hash == hash_refresh_token(token))
+        .where(RefreshToken.expires_at > now)
+        .where(or_(
+            RefreshToken.revoked_at.is_(None),
+            and_(RefreshToken.revoked_at > now - grace, ~successor_dead),
+        ))
+        .values(
+            revoked_at=revoked_at,
+            expires_at=func.least(RefreshToken.expires_at, revoked_at + grace),
+        )
+        .returning(RefreshToken.user_id, (RefreshToken.revoked_at == now).label("rotated"))
+        .cte("old_token")
+    )
+    new_token_row = (
+        insert(RefreshToken)
+        .from_select(
+            ["id", "user_id", "token_hash", "expires_at"],
+            select(
+                func.gen_random_uuid(),
+                old_token.c.user_id,
+                literal(hash_refresh_token(new_token), LargeBinary),
+                literal(expires_at, DateTime(timezone=True)),
+            )
+            .join(User, User.id == old_token.c.user_id)
+            .where(old_token.c.rotated, User.is_active.is_(True)),
+        )
+        .returning(RefreshToken.id)
+        .cte("new_token")
+    )
+    result = await db.execute(
+        select(User)
+        .join(old_token, User.id == old_token.c.user_id)
+        .where(User.is_active.is_(True))
+        .add_cte(new_token_row)
+    )
+    user = result.scalar_one_or_none()
+    await db.commit()
+
+    if user is None:
+        return None
+    return user, new_token
+
 async def revoke_refresh_token(db: AsyncSession, token: str) -> None:
     token_hash = hash_refresh_token(token)
+    now = datetime.now(timezone.utc)
+    # Also end the token's life so it cannot ride the rotation grace window
     await db.execute(
         update(RefreshToken)
         .where(RefreshToken.token_hash == token_hash)
-        .values(revoked_at=datetime.now(timezone.utc))
+        .values(revoked_at=now, expires_at=func.least(RefreshToken.expires_at, now))
     )
     await db.commit()
 
 async def revoke_all_user_tokens(db: AsyncSession, user_id: UUID) -> None:
+    now = datetime.now(timezone.utc)
     await db.execute(
         update(RefreshToken)
         .where(RefreshToken.user_id == user_id)
         .where(RefreshToken.revoked_at.is_(None))
-        .values(revoked_at=datetime.now(timezone.utc))
+        .values(revoked_at=now, expires_at=func.least(RefreshToken.expires_at, now))
     )
     await db.commit()
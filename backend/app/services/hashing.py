@@ -0,0 +1,95 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from app.config import get_settings
+
+T = TypeVar("T")
+
+settings = get_settings()
+
+class HashingPoolSaturatedError(RuntimeError):
+    pass
+
+class HashingPool:
+    """Runs CPU-bound password hashing off the event loop.
+
+    Admission is bounded: at most ``workers`` jobs run and ``queue_size`` more
+    may wait. Anything beyond that is rejected immediately with
+    HashingPoolSaturatedError instead of queueing without limit.
+    """
+
+    def __init__(self, workers: int, queue_size: int, kind: str = "thread"):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hashing executor kind: {kind}")
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.kind = kind
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        # Created lazily so importing this module never spawns threads/processes
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+
+    def _release_from(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            # Event loop already closed (e.g. a CLI command finished)
+            pass
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise HashingPoolSaturatedError("Password hashing pool is saturated")
+
+        loop = asyncio.get_running_loop()
+        future = self._get_executor().submit(fn, *args)
+        self.in_flight += 1
+        # Release the slot when the job really finishes, even if the awaiting
+        # request was cancelled while the hash was still running
+        future.add_done_callback(lambda _: self._release_from(loop))
+        return await asyncio.wrap_future(future)
+
+    async def warm(self, fn: Callable[..., Any], *args: Any) -> None:
+        """Start every worker and run ``fn`` once per worker, ahead of real traffic.
+
+        Bypasses admission, so call it before the app starts serving.
+        """
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(executor, fn, *args) for _ in range(self.workers)
+        ))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+        }
+
+hashing_pool = HashingPool(
+    workers=settings.password_hash_workers,
+    queue_size=settings.password_hash_queue_size,
+    kind=settings.password_hash_executor,
+)
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+from collections.abc import Callable
+from uuid import UUID
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import mark_recent_write, pin_reads_to_primary
+from app.services.auth import principal_cache
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Event kinds; a payload is "<kind>:<key>", or FLUSH on its own
+USER = "u"
+RECENT_WRITE = "w"
+FLUSH = "*"
+
+class InvalidationBus:
+    """Keeps per-worker caches in step across workers and nodes.
+
+    Writers publish compact events with NOTIFY; every worker holds one
+    LISTEN connection and evicts the matching local entries. Whenever the
+    connection is (re)established, local caches are flushed, since anything
+    published while it was down was missed. asyncpg runs one query per
+    connection at a time, so broadcasts and the keepalive take turns on it.
+    """
+
+    def __init__(self, channel: str, keepalive_seconds: float, reconnect_max_seconds: float):
+        self.channel = channel
+        self.keepalive_seconds = keepalive_seconds
+        self.reconnect_max_seconds = reconnect_max_seconds
+        self.received = 0
+        self.flushes = 0
+        self.reconnects = 0
+        self._handlers: dict[str, Callable[[str], None]] = {}
+        self._flush_handlers: list[Callable[[], None]] = []
+        self._conn: asyncpg.Connection | None = None
+        self._conn_lock: asyncio.Lock | None = None
+        self._sends: set[asyncio.Task] = set()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def register(
+        self, kind: str, on_event: Callable[[str], None], on_flush: Callable[[], None]
+    ) -> None:
+        self._handlers[kind] = on_event
+        self._flush_handlers.append(on_flush)
+
+    async def publish(self, db: AsyncSession, kind: str, key: UUID | str) -> None:
+        """NOTIFY inside the session's transaction; delivered only if it commits."""
+        await db.execute(select(func.pg_notify(self.channel, f"{kind}:{key}")))
+
+    def broadcast(self, kind: str, key: UUID | str) -> None:
+        """Best-effort NOTIFY over the listen connection, without waiting.
+
+        For hints that aren't tied to a transaction; dropped while the bus
+        is disconnected.
+        """
+        if self._conn is None:
+            return
+        task = asyncio.create_task(self._send(self._conn, self._conn_lock, f"{kind}:{key}"))
+        self._sends.add(task)
+        task.add_done_callback(self._sends.discard)
+
+    async def _send(self, conn: asyncpg.Connection, lock: asyncio.Lock, payload: str) -> None:
+        try:
+            async with lock:
+                if conn.is_closed():
+                    return  # lost while queued; the reconnect flush covers it
+                await conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+        except Exception:
+            logger.warning("Failed to broadcast invalidation %r", payload, exc_info=True)
+
+    def dispatch(self, payload: str) -> None:
+        self.received += 1
+        kind, _, key = payload.partition(":")
+        if kind == FLUSH:
+            self.flush()
+            return
+        handler = self._handlers.get(kind)
+        if handler is None:
+            # Published by a newer release; flushing is always safe
+            logger.warning("Unknown invalidation event %r, flushing", payload)
+            self.flush()
+            return
+        try:
+            handler(key)
+        except Exception:
+            logger.exception("Bad invalidation event %r, flushing", payload)
+            self.flush()
+
+    def flush(self) -> None:
+        self.flushes += 1
+        for on_flush in self._flush_handlers:
+            on_flush()
+
+    def _on_notification(self, conn, pid, channel, payload) -> None:
+        self.dispatch(payload)
+
+    async def listen(self, url: str) -> None:
+        """Hold a LISTEN connection until cancelled, reconnecting with backoff."""
+        dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        backoff = 0.5
+        while True:
+            try:
+                conn = await asyncpg.connect(dsn)
+            except Exception:
+                logger.warning("Invalidation listener could not connect", exc_info=True)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.reconnect_max_seconds)
+                continue
+
+            lost = asyncio.Event()
+            lock = asyncio.Lock()
+            conn.add_termination_listener(lambda _: lost.set())
+            try:
+                await conn.add_listener(self.channel, self._on_notification)
+                self._conn, self._conn_lock = conn, lock
+                self.flush()
+                backoff = 0.5
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), timeout=self.keepalive_seconds)
+                    except TimeoutError:
+                        # A silently dropped connection would otherwise never
+                        # notice it stopped receiving
+                        async with lock:
+                            await conn.execute("SELECT 1", timeout=self.keepalive_seconds)
+            except Exception:
+                logger.warning("Invalidation listener lost its connection", exc_info=True)
+            finally:
+                self._conn = self._conn_lock = None
+                if not conn.is_closed():
+                    conn.terminate()
+
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+
+    def start(self, url: str | None = None) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.listen(url or settings.database_url))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "received": self.received,
+            "flushes": self.flushes,
+            "reconnects": self.reconnects,
+        }
+
+invalidation_bus = InvalidationBus(
+    channel=settings.invalidation_channel,
+    keepalive_seconds=settings.invalidation_keepalive_seconds,
+    reconnect_max_seconds=settings.invalidation_reconnect_max_seconds,
+)
+
+invalidation_bus.register(
+    USER,
+    lambda key: principal_cache.invalidate(UUID(key)),
+    principal_cache.clear,
+)
+# Another worker's write makes this user's reads sticky here too. Missed
+# writes can't be attributed, so a flush keeps everyone on the primary
+# for one sticky window.
+invalidation_bus.register(
+    RECENT_WRITE,
+    lambda key: mark_recent_write(UUID(key)),
+    lambda: pin_reads_to_primary(settings.replica_sticky_seconds),
+)
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import DateTime, column, update, values
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import get_settings
+from app.database import get_engine
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+FLUSH_BATCH_SIZE = 1000
+
+class LastLoginBuffer:
+    """Coalesces last_login_at writes and flushes them in batched UPDATEs.
+
+    Only the newest timestamp per user is kept, so a burst of logins by one
+    user costs a single row update per flush interval.
+    """
+
+    def __init__(self, flush_interval_seconds: float):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.flushed = 0
+        self._pending: dict[UUID, datetime] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def record(self, user_id: UUID, at: datetime) -> None:
+        current = self._pending.get(user_id)
+        if current is None or at > current:
+            self._pending[user_id] = at
+
+    async def flush(self, engine: AsyncEngine | None = None) -> int:
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, {}
+        # Workers update overlapping users; taking row locks in one order
+        # keeps their flushes from deadlocking each other
+        items = sorted(batch.items())
+        try:
+            async with (engine or get_engine()).begin() as conn:
+                for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                    rows = values(
+                        column("id", PGUUID(as_uuid=True)),
+                        column("last_login_at", DateTime(timezone=True)),
+                        name="v",
+                    ).data(items[start:start + FLUSH_BATCH_SIZE])
+                    await conn.execute(
+                        update(User.__table__)
+                        .where(User.__table__.c.id == rows.c.id)
+                        .values(last_login_at=rows.c.last_login_at)
+                    )
+        except BaseException:
+            # Put the batch back without clobbering newer logins, also when
+            # stop() cancels a periodic flush so its final flush retries it
+            for user_id, at in items:
+                self.record(user_id, at)
+            raise
+
+        self.flushed += len(items)
+        return len(items)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush last_login_at updates")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def clear(self) -> None:
+        self._pending.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"pending": self.pending, "flushed": self.flushed}
+
+last_login_buffer = LastLoginBuffer(settings.last_login_flush_interval_seconds)
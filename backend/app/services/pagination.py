@@ -0,0 +1,49 @@
+import base64
+from datetime import datetime
+from uuid import UUID
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+def _encode(*parts: str) -> str:
+    raw = "|".join(parts).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode(cursor: str, size: int) -> list[str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursorError("Malformed cursor")
+    if len(parts) != size:
+        raise InvalidCursorError("Malformed cursor")
+    return parts
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    return _encode(created_at.isoformat(), str(id))
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    created_at, id = _decode(cursor, 2)
+    try:
+        parsed_at, parsed_id = datetime.fromisoformat(created_at), UUID(id)
+    except ValueError:
+        raise InvalidCursorError("Malformed cursor")
+    if parsed_at.tzinfo is None:
+        raise InvalidCursorError("Malformed cursor")
+    return parsed_at, parsed_id
+
+def encode_search_cursor(rank: float, created_at: datetime, id: UUID) -> str:
+    # repr() round-trips the float exactly, so the seek lands on the same row
+    return _encode(repr(rank), created_at.isoformat(), str(id))
+
+def decode_search_cursor(cursor: str) -> tuple[float, datetime, UUID]:
+    rank, created_at, id = _decode(cursor, 3)
+    try:
+        parsed_rank = float(rank)
+        parsed_at, parsed_id = datetime.fromisoformat(created_at), UUID(id)
+    except ValueError:
+        raise InvalidCursorError("Malformed cursor")
+    if parsed_at.tzinfo is None:
+        raise InvalidCursorError("Malformed cursor")
+    return parsed_rank, parsed_at, parsed_id
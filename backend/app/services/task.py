@@ -1,9 +1,43 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
+from itertools import groupby
+from typing import NamedTuple
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, update, delete
+from sqlalchemy import REAL, Boolean, Row, String, Text, case, cast, column, literal_column, select, func, update, delete, insert, tuple_, values
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
 
-from app.models.task import Task
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.models.task import SEARCH_CONFIG, Task
+from app.models.user_task_stats import UserTaskStats
+from app.schemas.task import (
+    TaskCreate,
+    TaskUpdate,
+    TaskFilter,
+    TaskBatchOperation,
+    TaskBatchCreate,
+    TaskBatchUpdate,
+    TaskBatchDelete,
+    TaskBatchUpdateWhere,
+    TaskBatchDeleteWhere,
+)
+from app.services.pagination import encode_cursor, encode_search_cursor
+
+# Refresh identity-mapped objects from RETURNING rows instead of leaving them stale
+_DML_OPTIONS = {"synchronize_session": False, "populate_existing": True}
+
+def _update_values(task_data: TaskUpdate) -> dict:
+    # Only description is nullable; a null title or is_completed means "unchanged"
+    return {
+        field: value
+        for field, value in task_data.model_dump(exclude_unset=True).items()
+        if value is not None or field == "description"
+    }
+
+class TaskStats(NamedTuple):
+    total: int
+    completed: int
+    # Bumped by the tasks triggers on every write; see UserTaskStats.version
+    version: int
 
 class TaskService:
     def __init__(self, db: AsyncSession):
@@ -17,7 +51,6 @@ class TaskService:
         )
         self.db.add(task)
         await self.db.commit()
-        await self.db.refresh(task)
         return task
 
     async def list_tasks(
@@ -26,23 +59,93 @@ class TaskService:
         is_completed: bool | None = None,
         limit: int = 50,
         offset: int = 0,
-    ) -> tuple[list[Task], int]:
+        cursor: tuple[datetime, UUID] | None = None,
+        stats: TaskStats | None = None,
+    ) -> tuple[list[Task], int, str | None]:
         query = select(Task).where(Task.user_id == user_id)
-        count_query = select(func.count(Task.id)).where(Task.user_id == user_id)
 
         if is_completed is not None:
             query = query.where(Task.is_completed == is_completed)
-            count_query = count_query.where(Task.is_completed == is_completed)
 
-        query = query.order_by(Task.created_at.desc()).limit(limit).offset(offset)
+        # Keyset pagination seeks past the cursor instead of scanning skipped rows
+        if cursor is not None:
+            query = query.where(tuple_(Task.created_at, Task.id) < tuple_(*cursor))
+        else:
+            query = query.offset(offset)
+
+        # Fetch one extra row to learn whether another page exists
+        query = query.order_by(Task.created_at.desc(), Task.id.desc()).limit(limit + 1)
 
         result = await self.db.execute(query)
         tasks = list(result.scalars().all())
 
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar() or 0
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_cursor(tasks[-1].created_at, tasks[-1].id)
+
+        # Callers that already read the stats (e.g. for an ETag) pass them in
+        if stats is None:
+            stats = await self.get_stats(user_id)
+        if is_completed is None:
+            total = stats.total
+        elif is_completed:
+            total = stats.completed
+        else:
+            total = stats.total - stats.completed
+
+        return tasks, total, next_cursor
+
+    async def search(
+        self,
+        user_id: UUID,
+        terms: str,
+        limit: int = 20,
+        cursor: tuple[float, datetime, UUID] | None = None,
+    ) -> tuple[list[Task], str | None]:
+        """Tasks matching web-search style terms, best match first.
 
-        return tasks, total
+        The GIN index on search_vector finds the matches; ranking and the
+        (rank, created_at, id) seek then run over this user's matches only.
+        Cursors are only meaningful for the terms they were issued for.
+        """
+        # Same configuration as the generated column, inlined rather than bound
+        query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), terms)
+        rank = func.ts_rank_cd(Task.search_vector, query)
+
+        stmt = (
+            select(Task, rank.label("rank"))
+            .where(Task.user_id == user_id, Task.search_vector.op("@@")(query))
+        )
+        if cursor is not None:
+            # ts_rank_cd returns real; compare in real so the seek is exact
+            cursor_rank, created_at, id = cursor
+            stmt = stmt.where(
+                tuple_(rank, Task.created_at, Task.id)
+                < tuple_(cast(cursor_rank, REAL), created_at, id)
+            )
+        stmt = stmt.order_by(rank.desc(), Task.created_at.desc(), Task.id.desc()).limit(limit + 1)
+
+        rows = (await self.db.execute(stmt)).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_search_cursor(last.rank, last.Task.created_at, last.Task.id)
+        return [row.Task for row in rows], next_cursor
+
+    async def iter_tasks(self, user_id: UUID, batch_size: int = 500) -> AsyncIterator[Row]:
+        # Server-side cursor: rows arrive batch_size at a time, so memory stays
+        # flat regardless of how many tasks the user has. Requires an open
+        # transaction on the session.
+        result = await self.db.stream(
+            select(*Task.__mapper__.columns)
+            .where(Task.user_id == user_id)
+            .order_by(Task.created_at.desc(), Task.id.desc())
+            .execution_options(yield_per=batch_size)
+        )
+        async for row in result:
+            yield row
 
     async def get_by_id(self, task_id: UUID, user_id: UUID) -> Task | None:
         result = await self.db.execute(
@@ -50,6 +153,12 @@ class TaskService:
         )
         return result.scalar_one_or_none()
 
+    async def get_updated_at(self, task_id: UUID, user_id: UUID) -> datetime | None:
+        result = await self.db.execute(
+            select(Task.updated_at).where(Task.id == task_id, Task.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
+
     async def update(self, task_id: UUID, user_id: UUID, task_data: TaskUpdate) -> Task | None:
         task = await self.get_by_id(task_id, user_id)
         if not task:
@@ -60,7 +169,6 @@ class TaskService:
             setattr(task, field, value)
 
         await self.db.commit()
-        await self.db.refresh(task)
         return task
 
     async def delete(self, task_id: UUID, user_id: UUID) -> bool:
@@ -72,8 +180,149 @@ class TaskService:
         await self.db.commit()
         return True
 
-    async def count_for_user(self, user_id: UUID) -> int:
+    async def get_stats(self, user_id: UUID) -> TaskStats:
         result = await self.db.execute(
-            select(func.count(Task.id)).where(Task.user_id == user_id)
+            select(
+                UserTaskStats.total_count,
+                UserTaskStats.completed_count,
+                UserTaskStats.version,
+            )
+            .where(UserTaskStats.user_id == user_id)
         )
-        return result.scalar() or 0
+        row = result.one_or_none()
+        if row is None:
+            return TaskStats(0, 0, 0)
+        return TaskStats(row.total_count, row.completed_count, row.version)
+
+    async def count_for_user(self, user_id: UUID) -> int:
+        return (await self.get_stats(user_id)).total
+
+    async def apply_batch(
+        self, user_id: UUID, operations: list[TaskBatchOperation]
+    ) -> list[dict]:
+        """Apply operations in order within one transaction.
+
+        Consecutive operations of the same kind run as one set-based statement.
+        """
+        results: list[dict] = [{} for _ in operations]
+        indexed = list(enumerate(operations))
+        for op, group in groupby(indexed, key=lambda item: item[1].op):
+            group = list(group)
+            if op == "create":
+                await self._batch_create(user_id, group, results)
+            elif op == "update":
+                await self._batch_update(user_id, group, results)
+            elif op == "delete":
+                await self._batch_delete(user_id, group, results)
+            else:
+                for index, operation in group:
+                    affected = await self._apply_predicate(user_id, operation)
+                    results[index] = {"op": op, "status": "ok", "affected": affected}
+
+        await self.db.commit()
+        return [{"index": index, **result} for index, result in enumerate(results)]
+
+    async def _batch_create(
+        self, user_id: UUID, group: list[tuple[int, TaskBatchCreate]], results: list[dict]
+    ) -> None:
+        tasks = await self.db.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True),
+            [
+                {"user_id": user_id, "title": op.title, "description": op.description}
+                for _, op in group
+            ],
+        )
+        for (index, _), task in zip(group, tasks.all()):
+            results[index] = {"op": "create", "status": "ok", "id": task.id, "task": task}
+
+    async def _batch_update(
+        self, user_id: UUID, group: list[tuple[int, TaskBatchUpdate]], results: list[dict]
+    ) -> None:
+        # Each row carries the new value plus a flag telling whether the field
+        # was sent, so an explicit null description differs from "unchanged"
+        rows = []
+        for _, op in group:
+            update_data = _update_values(op)
+            rows.append((
+                op.id,
+                op.title, "title" in update_data,
+                op.description, "description" in update_data,
+                op.is_completed, "is_completed" in update_data,
+            ))
+        changes = values(
+            column("id", PGUUID(as_uuid=True)),
+            column("title", String),
+            column("set_title", Boolean),
+            column("description", Text),
+            column("set_description", Boolean),
+            column("is_completed", Boolean),
+            column("set_is_completed", Boolean),
+            name="changes",
+        ).data(rows)
+
+        updated = await self.db.scalars(
+            update(Task)
+            .where(Task.id == changes.c.id, Task.user_id == user_id)
+            # Casts pin the type of VALUES columns that may hold only NULLs
+            .values(
+                title=case(
+                    (changes.c.set_title, cast(changes.c.title, String)), else_=Task.title
+                ),
+                description=case(
+                    (changes.c.set_description, cast(changes.c.description, Text)),
+                    else_=Task.description,
+                ),
+                is_completed=case(
+                    (changes.c.set_is_completed, cast(changes.c.is_completed, Boolean)),
+                    else_=Task.is_completed,
+                ),
+            )
+            .returning(Task),
+            execution_options=_DML_OPTIONS,
+        )
+        by_id = {task.id: task for task in updated.all()}
+        for index, op in group:
+            task = by_id.get(op.id)
+            if task is None:
+                results[index] = {"op": "update", "status": "not_found", "id": op.id}
+            else:
+                results[index] = {"op": "update", "status": "ok", "id": task.id, "task": task}
+
+    async def _batch_delete(
+        self, user_id: UUID, group: list[tuple[int, TaskBatchDelete]], results: list[dict]
+    ) -> None:
+        deleted = await self.db.scalars(
+            delete(Task)
+            .where(Task.user_id == user_id, Task.id.in_([op.id for _, op in group]))
+            .returning(Task.id),
+            execution_options={"synchronize_session": False},
+        )
+        deleted_ids = set(deleted.all())
+        for index, op in group:
+            status = "ok" if op.id in deleted_ids else "not_found"
+            results[index] = {"op": "delete", "status": status, "id": op.id}
+
+    def _filter_criteria(self, user_id: UUID, where: TaskFilter) -> list:
+        criteria = [Task.user_id == user_id]
+        if where.is_completed is not None:
+            criteria.append(Task.is_completed == where.is_completed)
+        return criteria
+
+    async def _apply_predicate(
+        self, user_id: UUID, operation: TaskBatchUpdateWhere | TaskBatchDeleteWhere
+    ) -> int:
+        criteria = self._filter_criteria(user_id, operation.where)
+        if isinstance(operation, TaskBatchUpdateWhere):
+            update_data = _update_values(operation.set)
+            if not update_data:
+                return 0
+            result = await self.db.scalars(
+                update(Task).where(*criteria).values(**update_data).returning(Task),
+                execution_options=_DML_OPTIONS,
+            )
+        else:
+            result = await self.db.scalars(
+                delete(Task).where(*criteria).returning(Task.id),
+                execution_options={"synchronize_session": False},
+            )
+        return len(result.all())
@@ -0,0 +1,186 @@
+import codecs
+import csv
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.task import TaskCreate
+
+STAGING_TABLE = "task_import_staging"
+MAX_REPORTED_REJECTIONS = 100
+
+class ImportLimitExceededError(ValueError):
+    pass
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines (newline kept) without buffering it whole.
+
+    Splitting happens before decoding; a newline byte never occurs inside a
+    multi-byte UTF-8 sequence, so a bad byte only spoils its own line.
+    """
+    pending = b""
+    first = True
+    async for chunk in chunks:
+        pending += chunk
+        if first:
+            if len(pending) < len(codecs.BOM_UTF8) and codecs.BOM_UTF8.startswith(pending):
+                continue
+            pending = pending.removeprefix(codecs.BOM_UTF8)
+            first = False
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line + b"\n"
+    if first:
+        pending = pending.removeprefix(codecs.BOM_UTF8)
+    if pending:
+        yield pending
+
+def _decode(line: bytes) -> tuple[str, str | None]:
+    """Decode a line, returning it (with bad bytes replaced) and any error."""
+    try:
+        return line.decode(), None
+    except UnicodeDecodeError as exc:
+        return line.decode(errors="replace"), f"Invalid UTF-8 at byte {exc.start} of the line"
+
+async def iter_records(
+    chunks: AsyncIterable[bytes], import_format: str
+) -> AsyncIterator[tuple[int, dict | str]]:
+    """Yield (line number, record) pairs, or (line number, error) for bad rows."""
+    line_no = 0
+    if import_format == "ndjson":
+        async for raw_line in iter_lines(chunks):
+            line_no += 1
+            line, error = _decode(raw_line)
+            if error is not None:
+                yield line_no, error
+                continue
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield line_no, f"Invalid JSON: {exc}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, "Expected a JSON object"
+                continue
+            yield line_no, record
+        return
+
+    # CSV records may span lines inside quoted fields; a record is complete
+    # once it holds an even number of quote characters
+    header: list[str] | None = None
+    record_lines: list[str] = []
+    record_error: str | None = None
+    record_start = 0
+    quotes = 0
+    async for raw_line in iter_lines(chunks):
+        line_no += 1
+        line, error = _decode(raw_line)
+        if not record_lines:
+            record_start = line_no
+        record_error = record_error or error
+        record_lines.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+
+        raw, record_lines, quotes = "".join(record_lines), [], 0
+        if record_error is not None:
+            yield record_start, record_error
+            record_error = None
+            continue
+        if not raw.strip():
+            continue
+        try:
+            values = next(csv.reader([raw]))
+        except csv.Error as exc:
+            yield record_start, f"Invalid CSV: {exc}"
+            continue
+
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        record = dict(zip(header, values))
+        if record.get("description") == "":
+            record["description"] = None
+        yield record_start, record
+
+    if record_lines:
+        yield record_start, "Invalid CSV: unterminated quoted field"
+
+class TaskImporter:
+    """Bulk-load validated tasks through binary COPY into a staging table.
+
+    Must run inside a transaction on the session with the RLS context set;
+    nothing is visible until the caller commits.
+    """
+
+    def __init__(self, db: AsyncSession, user_id: UUID, batch_size: int, max_rows: int):
+        self.db = db
+        self.user_id = user_id
+        self.batch_size = batch_size
+        self.max_rows = max_rows
+        self.rejected: list[dict] = []
+        self.rejected_count = 0
+
+    def _reject(self, line: int, error: str) -> None:
+        self.rejected_count += 1
+        if len(self.rejected) < MAX_REPORTED_REJECTIONS:
+            self.rejected.append({"line": line, "error": error})
+
+    async def _copy(self, rows: list[tuple[str, str | None]]) -> None:
+        connection = await self.db.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            STAGING_TABLE, records=rows, columns=["title", "description"]
+        )
+
+    async def run(self, records: AsyncIterable[tuple[int, dict | str]]) -> int:
+        await self.db.execute(text(
+            f"CREATE TEMP TABLE {STAGING_TABLE} (title text NOT NULL, description text) "
+            "ON COMMIT DROP"
+        ))
+
+        seen = 0
+        batch: list[tuple[str, str | None]] = []
+        async for line, record in records:
+            seen += 1
+            if seen > self.max_rows:
+                raise ImportLimitExceededError(f"Import exceeds {self.max_rows} rows")
+
+            if isinstance(record, str):
+                self._reject(line, record)
+                continue
+            try:
+                task = TaskCreate.model_validate(record)
+            except ValidationError as exc:
+                self._reject(line, "; ".join(
+                    f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+                    for err in exc.errors()
+                ))
+                continue
+
+            batch.append((task.title, task.description))
+            if len(batch) >= self.batch_size:
+                await self._copy(batch)
+                batch = []
+
+        if batch:
+            await self._copy(batch)
+
+        result = await self.db.execute(
+            text(
+                "INSERT INTO tasks "
+                "(id, user_id, title, description, is_completed, created_at, updated_at) "
+                "SELECT gen_random_uuid(), CAST(:user_id AS uuid), title, description, "
+                "false, now(), now() "
+                f"FROM {STAGING_TABLE}"
+            ),
+            {"user_id": self.user_id},
+        )
+        return result.rowcount
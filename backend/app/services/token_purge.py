@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import random
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import get_settings
+from app.database import get_engine
+from app.models.refresh_token import RefreshToken
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Read by the refresh_tokens purge policies (migration 006); only rows that
+# are already expired become visible, and only to the purge
+PURGE_SETTING = "app.purge_expired_tokens"
+
+class RefreshTokenPurger:
+    """Deletes refresh tokens that expired (or were revoked) a while ago.
+
+    Each batch is its own short transaction that deletes the oldest expired
+    rows, skipping any that are locked, then pauses, so the purge never holds
+    locks for long or saturates I/O. Several workers can purge at once.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float,
+        retention_seconds: float,
+        batch_size: int,
+        batch_pause_seconds: float,
+    ):
+        self.interval_seconds = interval_seconds
+        self.retention_seconds = retention_seconds
+        self.batch_size = batch_size
+        self.batch_pause_seconds = batch_pause_seconds
+        self.purged = 0
+        self.runs = 0
+        self.last_run_at: datetime | None = None
+        self._task: asyncio.Task | None = None
+
+    async def purge(self, engine: AsyncEngine | None = None) -> int:
+        """Delete every eligible row; returns how many were deleted."""
+        cutoff = func.now() - timedelta(seconds=self.retention_seconds)
+        batch = (
+            select(RefreshToken.id)
+            .where(RefreshToken.expires_at < cutoff)
+            .order_by(RefreshToken.expires_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = delete(RefreshToken).where(RefreshToken.id.in_(batch.scalar_subquery()))
+
+        total = 0
+        while True:
+            async with (engine or get_engine()).begin() as conn:
+                await conn.execute(text(f"SET LOCAL {PURGE_SETTING} = 'on'"))
+                deleted = (await conn.execute(stmt)).rowcount
+            total += deleted
+            self.purged += deleted
+            if deleted < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_pause_seconds)
+
+        self.runs += 1
+        self.last_run_at = datetime.now(UTC)
+        return total
+
+    async def _run(self) -> None:
+        # Spread workers that started together across the interval
+        await asyncio.sleep(random.uniform(0, self.interval_seconds))
+        while True:
+            try:
+                deleted = await self.purge()
+                if deleted:
+                    logger.info("Purged %d refresh tokens", deleted)
+            except Exception:
+                logger.exception("Failed to purge refresh tokens")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"purged": self.purged, "runs": self.runs, "last_run_at": self.last_run_at}
+
+refresh_token_purger = RefreshTokenPurger(
+    interval_seconds=settings.refresh_token_purge_interval_seconds,
+    retention_seconds=settings.refresh_token_purge_retention_seconds,
+    batch_size=settings.refresh_token_purge_batch_size,
+    batch_pause_seconds=settings.refresh_token_purge_batch_pause_seconds,
+)
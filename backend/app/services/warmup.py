@@ -0,0 +1,65 @@
+import asyncio
+import gc
+import logging
+import time
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.config import get_settings
+from app.database import get_engine, get_replica_engines, set_rls_context
+from app.services.auth import get_principal, get_user_by_email, hash_password
+from app.services.hashing import hashing_pool
+from app.services.task import TaskService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Matches no user, so priming reads nothing and caches nothing
+NIL_USER = UUID(int=0)
+
+async def _prime_connection(engine: AsyncEngine) -> None:
+    # Runs the hot read paths once, so this connection's prepared-statement
+    # cache and the engine's compiled-SQL cache are filled before traffic
+    async with engine.connect() as conn:
+        session = AsyncSession(bind=conn)
+        try:
+            await set_rls_context(session, str(NIL_USER))
+            await get_principal(session, NIL_USER)
+            await get_user_by_email(session, "")
+            service = TaskService(session)
+            await service.list_tasks(NIL_USER)
+            await service.get_by_id(NIL_USER, NIL_USER)
+            await service.search(NIL_USER, "warmup")
+        finally:
+            await session.close()
+
+async def warm_up(engine: AsyncEngine | None = None) -> None:
+    """Get a worker ready before it accepts requests.
+
+    Opens connections on the primary and every replica and primes them,
+    starts the hashing pool, then freezes everything allocated so far out of
+    the collector's reach. Failures are logged; the worker then starts cold.
+    """
+    start = time.perf_counter()
+    engines = [engine or get_engine(), *get_replica_engines()]
+    connections = min(settings.db_pool_warm_connections, settings.db_pool_size)
+    # Held concurrently, so each pool has to open that many connections
+    results = await asyncio.gather(
+        *(_prime_connection(e) for e in engines for _ in range(connections)),
+        hashing_pool.warm(hash_password, "warmup"),
+        return_exceptions=True,
+    )
+    # Modules, the app and pooled connections live as long as the process,
+    # so later full collections needn't keep rescanning them
+    gc.collect()
+    gc.freeze()
+
+    errors = [result for result in results if isinstance(result, Exception)]
+    if errors:
+        logger.error("Startup warmup failed; starting cold", exc_info=errors[0])
+        return
+    logger.info(
+        "Warmed up %d connection(s) per pool and %d hashing worker(s) in %.0f ms",
+        connections, hashing_pool.workers, (time.perf_counter() - start) * 1000,
+    )
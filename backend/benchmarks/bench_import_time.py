@@ -0,0 +1,109 @@
+"""Import-time report and budget, parsed from ``python -X importtime``.
+
+Imports each module in a fresh interpreter a few times and reports the
+median cumulative import time and the packages that cost the most. Exits 1
+when a module goes over its budget or imports a package it must not, so it
+can gate CI.
+
+    cd backend
+    python -m benchmarks.bench_import_time [--runs 5] [--budget app.cli=250]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+# Median cumulative import time, in milliseconds
+BUDGETS_MS = {
+    "app.cli": 250.0,
+    "app.database": 1_000.0,
+    "app.main": 2_500.0,
+}
+
+# Packages a module must not pull in at import time. CLI commands import
+# what they need when they run; the engine (and with it the asyncpg driver)
+# is built on first use.
+FORBIDDEN = {
+    "app.cli": ("sqlalchemy", "fastapi", "pydantic", "asyncpg", "jose", "passlib", "uvicorn"),
+    "app.database": ("asyncpg",),
+}
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    """Self and cumulative microseconds of every module imported by ``module``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        if not self_us.strip().isdigit():
+            continue  # the header
+        times.setdefault(name.strip(), (int(self_us), int(cumulative_us)))
+    return times
+
+def measure(module: str, runs: int) -> tuple[list[float], dict[str, tuple[int, int]]]:
+    import_times(module)  # fill the bytecode cache
+    samples = []
+    for _ in range(runs):
+        times = import_times(module)
+        samples.append((times[module][1] / 1000, times))
+    samples.sort(key=lambda sample: sample[0])
+    return [ms for ms, _ in samples], samples[len(samples) // 2][1]
+
+def by_package(times: dict[str, tuple[int, int]]) -> Counter:
+    packages = Counter()
+    for name, (self_us, _) in times.items():
+        packages[name.split(".")[0]] += self_us
+    return packages
+
+def main(runs: int, budgets: dict[str, float], top: int) -> int:
+    failures = []
+    for module, budget in budgets.items():
+        samples, times = measure(module, runs)
+        median = statistics.median(samples)
+        print(f"{module}: median {median:.1f} ms, min {samples[0]:.1f} ms (budget {budget:.0f} ms)")
+        for package, self_us in by_package(times).most_common(top):
+            print(f"  {package:<24}{self_us / 1000:>8.1f} ms")
+
+        if median > budget:
+            failures.append(f"{module} took {median:.1f} ms, over its {budget:.0f} ms budget")
+        imported = {name.split(".")[0] for name in times}
+        for package in FORBIDDEN.get(module, ()):
+            if package in imported:
+                failures.append(f"{module} imports {package}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+def parse_budget(value: str) -> tuple[str, float]:
+    module, _, ms = value.partition("=")
+    try:
+        return module, float(ms)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected MODULE=MS, got {value!r}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Packages listed per module")
+    parser.add_argument(
+        "--budget",
+        type=parse_budget,
+        action="append",
+        default=[],
+        metavar="MODULE=MS",
+        help="Override or add a module budget (repeatable)",
+    )
+    args = parser.parse_args()
+    sys.exit(main(args.runs, {**BUDGETS_MS, **dict(args.budget)}, args.top))
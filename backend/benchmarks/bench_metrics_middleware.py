@@ -0,0 +1,74 @@
+"""Microbenchmark: per-request overhead of MetricsMiddleware.
+
+Wraps a trivial ASGI app that stands in for a routed endpoint (it sets
+scope["route"] like the router does and sends a two-message response), so
+the difference between the two runs is the instrumentation alone.
+
+    cd backend
+    python -m benchmarks.bench_metrics_middleware [--requests 50000]
+"""
+import argparse
+import asyncio
+import time
+
+from app.middleware.metrics import MetricsMiddleware
+
+
+class Route:
+    path = "/api/tasks/{task_id}"
+
+ROUTE = Route()
+
+SCOPE = {
+    "type": "http",
+    "method": "GET",
+    "path": "/api/tasks/0f8fad5b-d9cb-469f-a165-70867728950e",
+}
+
+async def endpoint(scope, receive, send):
+    scope["route"] = ROUTE
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+class Passthrough:
+    """Baseline: a middleware layer that does nothing."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+
+async def drive(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(1000):
+        await app(dict(SCOPE), receive, send)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+async def main(requests: int) -> None:
+    # Interleave runs so frequency scaling affects both sides equally
+    bare = instrumented = 0.0
+    for _ in range(3):
+        bare += await drive(Passthrough(endpoint), requests)
+        instrumented += await drive(MetricsMiddleware(endpoint), requests)
+    bare, instrumented = bare / 3, instrumented / 3
+
+    print(f"{'layer':<24}{'us/request':>12}")
+    print(f"{'passthrough':<24}{bare:>12.2f}")
+    print(f"{'MetricsMiddleware':<24}{instrumented:>12.2f}")
+    print(f"{'overhead':<24}{instrumented - bare:>12.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,85 @@
+"""Microbenchmark: BaseHTTPMiddleware vs pure ASGI security headers.
+
+Drives a trivial ASGI endpoint directly (no network, no DB) so the numbers
+isolate per-request middleware overhead.
+
+    cd backend
+    python -m benchmarks.bench_security_headers [--requests 20000]
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import Request, Response
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.middleware.security import SECURITY_HEADERS, SecurityHeadersMiddleware
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """The previous implementation, kept here as the baseline."""
+
+    async def dispatch(self, request: Request, call_next) -> Response:
+        response = await call_next(request)
+        for name, value in SECURITY_HEADERS.items():
+            response.headers[name] = value
+        return response
+
+async def endpoint(request):
+    return PlainTextResponse("ok")
+
+def build_app(middleware_class=None) -> Starlette:
+    app = Starlette(routes=[Route("/", endpoint)])
+    if middleware_class is not None:
+        app.add_middleware(middleware_class)
+    return app
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/",
+    "raw_path": b"/",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"bench")],
+    "client": ("127.0.0.1", 50000),
+    "server": ("bench", 80),
+}
+
+async def drive(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    # Warm up routing and middleware stack construction
+    for _ in range(200):
+        await app(dict(SCOPE), receive, send)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+async def main(requests: int) -> None:
+    bare = await drive(build_app(), requests)
+    legacy = await drive(build_app(LegacySecurityHeadersMiddleware), requests)
+    asgi = await drive(build_app(SecurityHeadersMiddleware), requests)
+    print(f"{'middleware':<24}{'us/request':>12}")
+    print(f"{'none (reference)':<24}{bare:>12.1f}")
+    print(f"{'BaseHTTPMiddleware':<24}{legacy:>12.1f}")
+    print(f"{'pure ASGI':<24}{asgi:>12.1f}")
+    print(f"{'saved':<24}{legacy - asgi:>12.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,99 @@
+"""Microbenchmark: CPU to serialize one 100-task list page.
+
+Compares the old handler path (model per task, then FastAPI re-validating
+and re-serializing through response_model), the pydantic-core fast path
+newer FastAPI releases use, and the ORM-to-orjson projection in
+app.api.responses. Tasks are transient ORM objects (no DB) carrying the
+UUID subclass asyncpg returns, when asyncpg is installed.
+
+    cd backend
+    python -m benchmarks.bench_serialization [--pages 2000] [--page-size 100]
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import UTC, datetime
+
+from app.api.responses import dumps, project
+from app.models.task import Task
+from app.schemas.task import TaskListResponse, TaskResponse
+
+try:
+    from asyncpg.pgproto.pgproto import UUID as DriverUUID
+except ImportError:
+    DriverUUID = uuid.UUID
+
+def make_tasks(count: int) -> list[Task]:
+    now = datetime.now(UTC)
+    return [
+        Task(
+            id=DriverUUID(uuid.uuid4().bytes),
+            user_id=DriverUUID(uuid.uuid4().bytes),
+            title=f"Task {i}",
+            description=(
+                "Lorem ipsum dolor sit amet, consectetur adipiscing elit." if i % 3 else None
+            ),
+            is_completed=i % 2 == 0,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+def legacy(tasks: list[Task]) -> bytes:
+    # Handler builds models; FastAPI < 0.130 dumps them, validates the dict
+    # against response_model, encodes it and runs json.dumps
+    page = TaskListResponse(
+        tasks=[TaskResponse.model_validate(t) for t in tasks], total=len(tasks)
+    )
+    value = TaskListResponse.model_validate(page.model_dump())
+    return json.dumps(value.model_dump(mode="json")).encode()
+
+def pydantic_core(tasks: list[Task]) -> bytes:
+    # Handler builds models; newer FastAPI validates and dumps JSON in Rust
+    page = TaskListResponse(
+        tasks=[TaskResponse.model_validate(t) for t in tasks], total=len(tasks)
+    )
+    value = TaskListResponse.model_validate(page)
+    return value.__pydantic_serializer__.to_json(value)
+
+def orjson_projection(tasks: list[Task]) -> bytes:
+    return dumps({
+        "tasks": [project(t, TaskResponse) for t in tasks],
+        "total": len(tasks),
+        "next_cursor": None,
+    })
+
+def measure(fn, tasks: list[Task], pages: int) -> float:
+    for _ in range(pages // 10):
+        fn(tasks)
+    start = time.process_time()
+    for _ in range(pages):
+        fn(tasks)
+    return (time.process_time() - start) / pages * 1_000_000
+
+def main(pages: int, page_size: int) -> None:
+    tasks = make_tasks(page_size)
+    # Every path must produce the same document
+    expected = json.loads(legacy(tasks))
+    for fn in (pydantic_core, orjson_projection):
+        assert json.loads(fn(tasks)) == expected, fn.__name__
+
+    print(f"{'path':<28}{'CPU us/page':>12}")
+    baseline = None
+    for label, fn in (
+        ("legacy double validation", legacy),
+        ("pydantic-core dump_json", pydantic_core),
+        ("orjson projection", orjson_projection),
+    ):
+        cost = measure(fn, tasks, pages)
+        baseline = baseline or cost
+        print(f"{label:<28}{cost:>12.1f}  ({baseline / cost:.1f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+    main(args.pages, args.page_size)
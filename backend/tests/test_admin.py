@@ -2,8 +2,17 @@ import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.models.user import User, UserRole
 from app.models.task import Task
+from app.services.admin import AdminService
+
+async def _add_users(db: AsyncSession, count: int) -> None:
+    db.add_all(
+        User(email=f"member{i}@example.com", password_hash="x", role=UserRole.USER)
+        for i in range(count)
+    )
+    await db.commit()
 
 class TestAdminListUsers:
     async def test_admin_list_users(self, client: AsyncClient, admin_headers: dict, test_user: User):
@@ -18,6 +27,58 @@ class TestAdminListUsers:
         response = await client.get("/api/admin/users", headers=auth_headers)
         assert response.status_code == 403
 
+    async def test_keyset_pages_cover_every_user_once(
+        self, client: AsyncClient, admin_headers: dict, db: AsyncSession
+    ):
+        await _add_users(db, 5)
+
+        emails, cursor = [], None
+        while True:
+            params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+            response = await client.get("/api/admin/users", params=params, headers=admin_headers)
+            assert response.status_code == 200
+            data = response.json()
+            emails += [u["email"] for u in data["users"]]
+            # Only the first page is counted
+            assert (data["total"] is None) == (cursor is not None)
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        assert len(emails) == len(set(emails)) == 6  # five plus the admin
+
+    async def test_filters_by_email_status_and_role(
+        self, client: AsyncClient, admin_headers: dict, db: AsyncSession
+    ):
+        await _add_users(db, 3)
+        db.add(User(email="m_x@example.com", password_hash="x", is_active=False))
+        await db.commit()
+
+        async def emails(**params) -> list[str]:
+            response = await client.get("/api/admin/users", params=params, headers=admin_headers)
+            assert response.status_code == 200
+            return sorted(u["email"] for u in response.json()["users"])
+
+        assert await emails(email="MEMBER1") == ["member1@example.com"]
+        assert await emails(email="member") == [f"member{i}@example.com" for i in range(3)]
+        # LIKE wildcards in the search are matched literally
+        assert await emails(email="m_") == ["m_x@example.com"]
+        assert await emails(is_active="false") == ["m_x@example.com"]
+        assert await emails(role="admin") == ["admin@example.com"]
+
+    async def test_total_stops_counting_at_the_cap(self, db: AsyncSession, test_user: User):
+        await _add_users(db, 3)
+
+        users, total, _ = await AdminService(db).list_users(limit=1, count_limit=2)
+        assert len(users) == 1
+        assert total == 3  # counted up to cap + 1, so the caller knows it was capped
+
+    async def test_invalid_cursor_rejected(self, client: AsyncClient, admin_headers: dict):
+        response = await client.get(
+            "/api/admin/users", params={"cursor": "not-a-cursor"}, headers=admin_headers
+        )
+        assert response.status_code == 400
+
 class TestAdminGetUser:
     async def test_admin_get_user_details(
         self, client: AsyncClient, admin_headers: dict, test_user: User, db: AsyncSession
@@ -80,6 +141,43 @@ class TestAdminUpdateUser:
         assert response.status_code == 400
         assert "own account" in response.json()["detail"].lower()
 
+class TestPrincipalCache:
+    async def test_deactivation_takes_effect_immediately(
+        self, client: AsyncClient, admin_headers: dict, auth_headers: dict, test_user: User
+    ):
+        # Warm the principal cache for the user
+        response = await client.get("/api/tasks", headers=auth_headers)
+        assert response.status_code == 200
+
+        response = await client.patch(
+            f"/api/admin/users/{test_user.id}",
+            json={"is_active": False},
+            headers=admin_headers,
+        )
+        assert response.status_code == 200
+
+        response = await client.get("/api/tasks", headers=auth_headers)
+        assert response.status_code == 403
+
+    async def test_runtime_stats_report_cache_hits(
+        self, client: AsyncClient, admin_headers: dict
+    ):
+        await client.get("/api/admin/users", headers=admin_headers)
+        response = await client.get("/api/admin/runtime", headers=admin_headers)
+        assert response.status_code == 200
+        stats = response.json()["principal_cache"]
+        assert stats["misses"] >= 1
+        assert stats["hits"] >= 1
+        assert stats["size"] >= 1
+
+    async def test_runtime_stats_report_db_pool(self, client: AsyncClient, admin_headers: dict):
+        response = await client.get("/api/admin/runtime", headers=admin_headers)
+        assert response.status_code == 200
+        pool = response.json()["db_pool"]
+        assert pool["size"] == get_settings().db_pool_size
+        assert pool["overflow"] >= 0
+        assert pool["wait_seconds"]["buckets"]["+Inf"] == pool["wait_seconds"]["count"]
+
 class TestNonAdminAccess:
     async def test_non_admin_cannot_list_users(self, client: AsyncClient, auth_headers: dict):
         response = await client.get("/api/admin/users", headers=auth_headers)
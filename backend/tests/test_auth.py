@@ -1,9 +1,41 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+
 import pytest
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
 from httpx import AsyncClient
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User, UserRole
-from app.services.auth import hash_password
+from app.config import get_settings
+from app.models.refresh_token import RefreshToken
+from app.services import auth
+from app.services.auth import (
+    create_access_token,
+    decode_access_token,
+    derive_successor_refresh_token,
+    hash_password,
+    hash_refresh_token,
+    verified_token_cache,
+)
+from app.services.hashing import hashing_pool
+from app.services.login_buffer import last_login_buffer
+from app.services.token_purge import RefreshTokenPurger
+
+async def _login_refresh_cookie(client: AsyncClient, user: User) -> str:
+    response = await client.post(
+        "/api/auth/login",
+        json={"email": user.email, "password": "testpassword123"},
+    )
+    return response.cookies["refresh_token"]
+
+async def _refresh(client: AsyncClient, token: str):
+    # Cookies are marked Secure, so send them explicitly over the http test transport
+    return await client.post("/api/auth/refresh", headers={"Cookie": f"refresh_token={token}"})
 
 class TestRegister:
     async def test_register_success(self, client: AsyncClient):
@@ -82,11 +114,200 @@ class TestLogin:
         assert response.status_code == 403
         assert "deactivated" in response.json()["detail"].lower()
 
+    async def test_login_buffers_last_login_until_flush(
+        self, client: AsyncClient, test_user: User, db: AsyncSession
+    ):
+        response = await client.post(
+            "/api/auth/login",
+            json={"email": test_user.email, "password": "testpassword123"},
+        )
+        assert response.status_code == 200
+        assert response.json()["user"]["last_login_at"] is not None
+        assert last_login_buffer.pending == 1
+
+        flushed = await last_login_buffer.flush(db.bind)
+        assert flushed == 1
+        assert last_login_buffer.pending == 0
+
+        await db.refresh(test_user)
+        assert test_user.last_login_at is not None
+
+    async def test_cancelled_flush_keeps_pending_logins(self):
+        class StalledEngine:
+            def begin(self):
+                return self
+
+            async def __aenter__(self):
+                await asyncio.Event().wait()
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+        last_login_buffer.record(uuid4(), datetime.now(timezone.utc))
+        flush = asyncio.create_task(last_login_buffer.flush(StalledEngine()))
+        await asyncio.sleep(0)
+        flush.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await flush
+        assert last_login_buffer.pending == 1
+
+    async def test_login_returns_503_when_hashing_pool_saturated(
+        self, client: AsyncClient, test_user: User, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(hashing_pool, "capacity", 0)
+
+        response = await client.post(
+            "/api/auth/login",
+            json={"email": test_user.email, "password": "testpassword123"},
+        )
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+
 class TestLogout:
     async def test_logout_clears_session(self, client: AsyncClient, auth_headers: dict):
         response = await client.post("/api/auth/logout", headers=auth_headers)
         assert response.status_code == 204
 
+class TestRefresh:
+    async def test_refresh_rotates_token(self, client: AsyncClient, test_user: User):
+        token = await _login_refresh_cookie(client, test_user)
+
+        response = await _refresh(client, token)
+        assert response.status_code == 200
+        assert "access_token" in response.json()
+        new_token = response.cookies["refresh_token"]
+        assert new_token != token
+
+        response = await _refresh(client, new_token)
+        assert response.status_code == 200
+
+    def test_rotation_is_keyed_apart_from_the_jwt_key(self, monkeypatch: pytest.MonkeyPatch):
+        settings = get_settings()
+        monkeypatch.setattr(settings, "refresh_token_secret_key", "")
+        monkeypatch.setattr(auth, "REFRESH_ROTATION_KEY", auth._refresh_rotation_key())
+        derived = derive_successor_refresh_token("token")
+
+        digest = hmac.new(
+            settings.jwt_secret_key.encode(), b"refresh-rotation:token", hashlib.sha256
+        ).digest()
+        assert derived != base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+        monkeypatch.setattr(settings, "refresh_token_secret_key", "a-separate-rotation-key")
+        monkeypatch.setattr(auth, "REFRESH_ROTATION_KEY", auth._refresh_rotation_key())
+        assert derive_successor_refresh_token("token") != derived
+
+    async def test_concurrent_refresh_reuses_successor(self, client: AsyncClient, test_user: User):
+        token = await _login_refresh_cookie(client, test_user)
+
+        first = await _refresh(client, token)
+        second = await _refresh(client, token)
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert first.cookies["refresh_token"] == second.cookies["refresh_token"]
+
+    async def test_reuse_after_grace_window_rejected(
+        self, client: AsyncClient, test_user: User, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(get_settings(), "refresh_token_reuse_grace_seconds", 0)
+        token = await _login_refresh_cookie(client, test_user)
+
+        assert (await _refresh(client, token)).status_code == 200
+        assert (await _refresh(client, token)).status_code == 401
+
+    async def test_refresh_after_logout_rejected(
+        self, client: AsyncClient, test_user: User, auth_headers: dict
+    ):
+        token = await _login_refresh_cookie(client, test_user)
+        await client.post(
+            "/api/auth/logout",
+            headers={**auth_headers, "Cookie": f"refresh_token={token}"},
+        )
+
+        response = await _refresh(client, token)
+        assert response.status_code == 401
+
+    async def test_rotated_token_rejected_after_logout(
+        self, client: AsyncClient, test_user: User, auth_headers: dict
+    ):
+        token = await _login_refresh_cookie(client, test_user)
+        successor = (await _refresh(client, token)).cookies["refresh_token"]
+        await client.post(
+            "/api/auth/logout",
+            headers={**auth_headers, "Cookie": f"refresh_token={successor}"},
+        )
+
+        # Still inside the reuse grace window, but its successor is revoked
+        response = await _refresh(client, token)
+        assert response.status_code == 401
+
+    async def test_refresh_rejects_unknown_token(self, client: AsyncClient):
+        response = await _refresh(client, "not-a-real-token")
+        assert response.status_code == 401
+
+class TestRefreshTokenPurge:
+    async def test_purge_deletes_only_tokens_past_retention(self, db: AsyncSession, test_user: User):
+        now = datetime.now(timezone.utc)
+        expiries = {
+            "long-expired-1": now - timedelta(days=3),
+            "long-expired-2": now - timedelta(days=2),
+            "long-expired-3": now - timedelta(days=2),
+            "recently-expired": now - timedelta(hours=1),
+            "active": now + timedelta(days=7),
+        }
+        db.add_all([
+            RefreshToken(user_id=test_user.id, token_hash=hash_refresh_token(name), expires_at=at)
+            for name, at in expiries.items()
+        ])
+        await db.commit()
+
+        # Batches smaller than the backlog exercise the batching loop
+        purger = RefreshTokenPurger(
+            interval_seconds=3600, retention_seconds=86400, batch_size=2, batch_pause_seconds=0
+        )
+        assert await purger.purge(db.bind) == 3
+        assert purger.stats()["purged"] == 3
+
+        remaining = (await db.execute(select(RefreshToken.token_hash))).scalars().all()
+        assert sorted(remaining) == sorted(
+            [hash_refresh_token("recently-expired"), hash_refresh_token("active")]
+        )
+
+    async def test_rotation_expires_old_token_after_grace_window(
+        self, client: AsyncClient, db: AsyncSession, test_user: User
+    ):
+        token = await _login_refresh_cookie(client, test_user)
+        assert (await _refresh(client, token)).status_code == 200
+
+        old = (await db.execute(
+            select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(token))
+        )).scalar_one()
+        await db.refresh(old)
+        grace = timedelta(seconds=get_settings().refresh_token_reuse_grace_seconds)
+        # Rotated tokens become purgeable shortly after their grace window
+        assert old.expires_at == old.revoked_at + grace
+
+class TestAccessTokenCache:
+    def test_repeat_decode_is_served_from_cache(self):
+        token = create_access_token({"sub": "user-id"})
+
+        first = decode_access_token(token)
+        second = decode_access_token(token)
+
+        assert second == first
+        assert second["sub"] == "user-id"
+        stats = verified_token_cache.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+
+    def test_invalid_and_expired_tokens_are_not_cached(self):
+        token = create_access_token({"sub": "user-id"})
+        expired = create_access_token({"sub": "user-id"}, expires_delta=timedelta(seconds=-1))
+
+        assert decode_access_token(token[:-2] + "xx") is None
+        assert decode_access_token(expired) is None
+        assert verified_token_cache.stats()["size"] == 0
+
 class TestProtectedRoutes:
     async def test_protected_route_requires_auth(self, client: AsyncClient):
         response = await client.get("/api/auth/me")
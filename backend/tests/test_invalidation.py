@@ -0,0 +1,111 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.services.auth import Principal, principal_cache
+from app.services.invalidation import FLUSH, RECENT_WRITE, USER, InvalidationBus, invalidation_bus
+from tests.conftest import TEST_DATABASE_URL
+
+
+def _cache_principal(user: User) -> None:
+    principal_cache.set(user.id, Principal(user.id, user.email, user.role, user.is_active))
+
+async def _eventually(condition, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.02)
+
+@pytest.fixture
+async def listening_bus():
+    bus = InvalidationBus(
+        channel=invalidation_bus.channel, keepalive_seconds=1.0, reconnect_max_seconds=1.0
+    )
+    # Share the real handlers, as every worker's bus does
+    bus._handlers = invalidation_bus._handlers
+    bus._flush_handlers = invalidation_bus._flush_handlers
+    bus.start(TEST_DATABASE_URL)
+    await _eventually(lambda: bus.connected)
+    yield bus
+    await bus.stop()
+
+class TestDispatch:
+    def test_user_event_evicts_principal(self, test_user: User):
+        _cache_principal(test_user)
+        other = uuid4()
+        principal_cache.set(other, Principal(other, "other@example.com", test_user.role, True))
+
+        invalidation_bus.dispatch(f"{USER}:{test_user.id}")
+
+        assert principal_cache.get(test_user.id) is None
+        assert principal_cache.get(other) is not None
+
+    @pytest.mark.parametrize("payload", [FLUSH, "unknown:key", f"{USER}:not-a-uuid"])
+    def test_flushes_on_flush_unknown_or_bad_events(self, test_user: User, payload: str):
+        _cache_principal(test_user)
+        invalidation_bus.dispatch(payload)
+        assert principal_cache.get(test_user.id) is None
+
+class TestListener:
+    async def test_deactivation_evicts_on_every_listener(
+        self,
+        client: AsyncClient,
+        admin_headers: dict,
+        test_user: User,
+        listening_bus: InvalidationBus,
+    ):
+        received = listening_bus.received
+        _cache_principal(test_user)
+
+        response = await client.patch(
+            f"/api/admin/users/{test_user.id}",
+            json={"is_active": False},
+            headers=admin_headers,
+        )
+        assert response.status_code == 200
+
+        await _eventually(lambda: listening_bus.received > received)
+        assert principal_cache.get(test_user.id) is None
+
+    async def test_rolled_back_publish_is_not_delivered(
+        self, db: AsyncSession, test_user: User, listening_bus: InvalidationBus
+    ):
+        user_id = test_user.id  # expired by the rollback
+        _cache_principal(test_user)
+
+        await listening_bus.publish(db, USER, user_id)
+        await db.rollback()
+        await listening_bus.publish(db, FLUSH, "")
+        await db.commit()
+
+        await _eventually(lambda: listening_bus.received == 1)
+        # Only the committed flush arrived, and it cleared the cache
+        assert principal_cache.get(user_id) is None
+
+    async def test_concurrent_broadcasts_share_the_connection(self, listening_bus: InvalidationBus):
+        received = listening_bus.received
+        for _ in range(20):
+            listening_bus.broadcast(RECENT_WRITE, uuid4())
+
+        await _eventually(lambda: listening_bus.received == received + 20)
+        assert listening_bus.reconnects == 0
+        assert listening_bus.connected
+
+    async def test_reconnects_and_flushes_after_losing_connection(
+        self, db: AsyncSession, test_user: User, listening_bus: InvalidationBus
+    ):
+        flushes = listening_bus.flushes
+        _cache_principal(test_user)
+
+        pid = listening_bus._conn.get_server_pid()
+        await db.execute(text("SELECT pg_terminate_backend(:pid)"), {"pid": pid})
+        await db.commit()
+
+        await _eventually(lambda: listening_bus.reconnects == 1 and listening_bus.connected)
+        assert listening_bus.flushes > flushes
+        assert principal_cache.get(test_user.id) is None
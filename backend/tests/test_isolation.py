@@ -1,60 +1,159 @@
+from typing import AsyncGenerator
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
+from app.database import get_db, set_rls_context
+from app.main import app
 from app.models.user import User
 from app.models.task import Task
-from app.database import set_rls_context
+from tests.conftest import TEST_DATABASE_URL
+
+# create_all builds the tables without the policies from 001_initial_schema,
+# and the test login owns them (and may be a superuser, which bypasses RLS
+# entirely), so these tests connect as a separate unprivileged role
+RLS_ROLE = "taskmanager_rls_test"
+
+rls_engine = create_async_engine(
+    TEST_DATABASE_URL,
+    poolclass=NullPool,
+    connect_args={"server_settings": {"role": RLS_ROLE}},
+)
+rls_session_maker = async_sessionmaker(rls_engine, class_=AsyncSession, expire_on_commit=False)
+
+@pytest.fixture(autouse=True)
+async def enforce_rls(db: AsyncSession):
+    async with db.bind.begin() as conn:
+        await conn.execute(text(f"""
+            DO $$ BEGIN
+                CREATE ROLE {RLS_ROLE} NOLOGIN;
+            EXCEPTION WHEN duplicate_object THEN NULL;
+            END $$
+        """))
+        await conn.execute(text(f"GRANT {RLS_ROLE} TO CURRENT_USER"))
+        await conn.execute(text(
+            f"GRANT SELECT, INSERT, UPDATE, DELETE ON ALL TABLES IN SCHEMA public TO {RLS_ROLE}"
+        ))
+        await conn.execute(text("ALTER TABLE tasks ENABLE ROW LEVEL SECURITY"))
+        await conn.execute(text("ALTER TABLE tasks FORCE ROW LEVEL SECURITY"))
+        await conn.execute(text("""
+            CREATE POLICY tasks_isolation_policy ON tasks
+            FOR ALL
+            USING (user_id = COALESCE(current_setting('app.current_user_id', true)::uuid, '00000000-0000-0000-0000-000000000000'::uuid))
+        """))
+
+@pytest.fixture
+async def rls_db() -> AsyncGenerator[AsyncSession, None]:
+    async with rls_session_maker() as session:
+        yield session
+
+async def _add_task(session: AsyncSession, user: User, title: str) -> Task:
+    await set_rls_context(session, str(user.id))
+    task = Task(user_id=user.id, title=title)
+    session.add(task)
+    await session.commit()
+    return task
 
 class TestRLSIsolation:
-    async def test_rls_prevents_cross_user_access(self, db: AsyncSession, test_user: User, test_admin: User):
-        # Create tasks for both users
-        user_task = Task(user_id=test_user.id, title="User's task")
-        admin_task = Task(user_id=test_admin.id, title="Admin's task")
-        db.add_all([user_task, admin_task])
-        await db.commit()
+    async def test_rls_prevents_cross_user_access(
+        self, rls_db: AsyncSession, test_user: User, test_admin: User
+    ):
+        await _add_task(rls_db, test_user, "User's task")
+        await _add_task(rls_db, test_admin, "Admin's task")
 
         # Set RLS context to test_user
-        await set_rls_context(db, str(test_user.id))
+        await set_rls_context(rls_db, str(test_user.id))
 
-        # Query tasks - should only see test_user's task
-        result = await db.execute(select(Task))
+        # Query tasks without a user filter - should only see test_user's task
+        result = await rls_db.execute(select(Task))
         tasks = result.scalars().all()
 
-        # Due to RLS, only user's task should be visible
         assert len(tasks) == 1
         assert tasks[0].title == "User's task"
         assert tasks[0].user_id == test_user.id
 
-    async def test_rls_prevents_cross_user_update(self, db: AsyncSession, test_user: User, test_admin: User):
-        # Create a task for admin
-        admin_task = Task(user_id=test_admin.id, title="Admin's task")
-        db.add(admin_task)
-        await db.commit()
-        await db.refresh(admin_task)
+    async def test_rls_prevents_cross_user_update(
+        self, rls_db: AsyncSession, test_user: User, test_admin: User
+    ):
+        admin_task = await _add_task(rls_db, test_admin, "Admin's task")
 
-        # Set RLS context to test_user
-        await set_rls_context(db, str(test_user.id))
+        await set_rls_context(rls_db, str(test_user.id))
 
-        # Try to update admin's task - should not find it
-        result = await db.execute(select(Task).where(Task.id == admin_task.id))
-        task = result.scalar_one_or_none()
+        result = await rls_db.execute(select(Task).where(Task.id == admin_task.id))
+        assert result.scalar_one_or_none() is None
+        result = await rls_db.execute(
+            update(Task).where(Task.id == admin_task.id).values(title="Hijacked")
+        )
+        assert result.rowcount == 0
 
-        # RLS should hide the task
-        assert task is None
+    async def test_rls_prevents_cross_user_delete(
+        self, rls_db: AsyncSession, test_user: User, test_admin: User
+    ):
+        admin_task = await _add_task(rls_db, test_admin, "Admin's task")
 
-    async def test_rls_prevents_cross_user_delete(self, db: AsyncSession, test_user: User, test_admin: User):
-        # Create a task for admin
-        admin_task = Task(user_id=test_admin.id, title="Admin's task")
-        db.add(admin_task)
-        await db.commit()
-        task_id = admin_task.id
+        await set_rls_context(rls_db, str(test_user.id))
 
-        # Set RLS context to test_user
-        await set_rls_context(db, str(test_user.id))
+        result = await rls_db.execute(delete(Task).where(Task.id == admin_task.id))
+        assert result.rowcount == 0
+
+    async def test_no_context_sees_nothing(self, rls_db: AsyncSession, test_user: User):
+        await _add_task(rls_db, test_user, "User's task")
+
+        async with rls_session_maker() as fresh:
+            assert (await fresh.execute(select(Task))).scalars().all() == []
+
+    async def test_context_survives_commit(self, rls_db: AsyncSession, test_user: User):
+        # SET LOCAL used to end with the transaction; the begin hook re-applies
+        # the context to every transaction the session starts
+        await set_rls_context(rls_db, str(test_user.id))
+        rls_db.add(Task(user_id=test_user.id, title="First"))
+        await rls_db.commit()
+        rls_db.add(Task(user_id=test_user.id, title="Second"))
+        await rls_db.commit()
+
+        titles = (await rls_db.execute(select(Task.title).order_by(Task.title))).scalars().all()
+        assert titles == ["First", "Second"]
+
+    async def test_switching_user_mid_transaction(
+        self, rls_db: AsyncSession, test_user: User, test_admin: User
+    ):
+        await _add_task(rls_db, test_user, "User's task")
+        await _add_task(rls_db, test_admin, "Admin's task")
+
+        await set_rls_context(rls_db, str(test_user.id))
+        assert (await rls_db.execute(select(Task.title))).scalars().all() == ["User's task"]
+
+        # The transaction is already under way, so the new id applies at once
+        await set_rls_context(rls_db, str(test_admin.id))
+        assert (await rls_db.execute(select(Task.title))).scalars().all() == ["Admin's task"]
+
+    async def test_user_id_is_bound_not_interpolated(self, rls_db: AsyncSession, test_admin: User):
+        crafted = f"x', true); SELECT set_config('app.current_user_id', '{test_admin.id}"
+        await set_rls_context(rls_db, crafted)
+
+        setting = await rls_db.scalar(text("SELECT current_setting('app.current_user_id')"))
+        assert setting == crafted
+
+    async def test_api_requests_are_isolated(
+        self, rls_db: AsyncSession, auth_headers: dict, test_user: User, test_admin: User
+    ):
+        admin_task = await _add_task(rls_db, test_admin, "Admin's task")
+
+        async def override_get_db():
+            yield rls_db
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.post("/api/tasks", json={"title": "Mine"}, headers=auth_headers)
+                assert response.status_code == 201
 
-        # Try to query admin's task - should not find it
-        result = await db.execute(select(Task).where(Task.id == task_id))
-        task = result.scalar_one_or_none()
+                response = await client.get("/api/tasks", headers=auth_headers)
+                assert [t["title"] for t in response.json()["tasks"]] == ["Mine"]
 
-        assert task is None
+                response = await client.get(f"/api/tasks/{admin_task.id}", headers=auth_headers)
+                assert response.status_code == 404
+        finally:
+            app.dependency_overrides.clear()
@@ -0,0 +1,63 @@
+import pytest
+from httpx import AsyncClient
+
+from app.metrics import Counter, Histogram, LabeledHistogram, Registry
+from app.models.user import User
+
+
+class TestHistogram:
+    def test_snapshot_is_cumulative(self):
+        histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+        for value in (0.005, 0.01, 0.05, 2.0):
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+        assert snapshot["buckets"] == {"0.01": 2, "0.1": 3, "1.0": 3, "+Inf": 4}
+        assert snapshot["count"] == 4
+        assert snapshot["sum"] == pytest.approx(2.065)
+
+class TestHealth:
+    async def test_health_reports_pool_usage(self, client: AsyncClient):
+        response = await client.get("/health")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "healthy"
+        assert set(data["db_pool"]) == {"size", "checked_out", "overflow", "timeouts"}
+
+class TestRegistry:
+    def test_renders_prometheus_text(self):
+        registry = Registry()
+        counter = registry.register(Counter("jobs_total", "Jobs run", ["kind"]))
+        histogram = registry.register(
+            LabeledHistogram("job_seconds", "Job time", ["kind"], buckets=(0.1, 1.0))
+        )
+        counter.inc('say "hi"')
+        histogram.labels("a").observe(0.5)
+
+        lines = registry.render().splitlines()
+        assert "# TYPE jobs_total counter" in lines
+        assert 'jobs_total{kind="say \\"hi\\""} 1' in lines
+        assert 'job_seconds_bucket{kind="a",le="0.1"} 0' in lines
+        assert 'job_seconds_bucket{kind="a",le="1.0"} 1' in lines
+        assert 'job_seconds_bucket{kind="a",le="+Inf"} 1' in lines
+        assert 'job_seconds_count{kind="a"} 1' in lines
+
+class TestMetricsEndpoint:
+    async def test_labels_use_route_templates(
+        self, client: AsyncClient, auth_headers: dict, test_user: User
+    ):
+        created = await client.post("/api/tasks", json={"title": "One"}, headers=auth_headers)
+        task_id = created.json()["id"]
+        await client.get(f"/api/tasks/{task_id}", headers=auth_headers)
+        await client.get("/no/such/path")
+
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert 'http_requests_total{method="GET",route="/api/tasks/{task_id}",status="200"}' in body
+        assert 'route="<unmatched>"' in body
+        assert task_id not in body
+        assert 'http_request_db_queries_count{route="/api/tasks/{task_id}"}' in body
+        assert 'jwt_duration_seconds_count{operation="decode"}' in body
+        assert "db_pool_checked_out" in body
@@ -0,0 +1,36 @@
+from httpx import AsyncClient
+
+from app.config import get_settings
+from app.middleware.security import SECURITY_HEADERS
+
+
+class TestSecurityHeaders:
+    async def test_security_headers_on_every_response(self, client: AsyncClient):
+        response = await client.get("/health")
+        assert response.status_code == 200
+        for name, value in SECURITY_HEADERS.items():
+            assert response.headers[name] == value
+
+    async def test_security_headers_on_error_response(self, client: AsyncClient):
+        response = await client.get("/api/tasks")
+        assert response.status_code in (401, 403)
+        assert response.headers["X-Frame-Options"] == "DENY"
+
+    async def test_security_headers_not_duplicated(self, client: AsyncClient):
+        response = await client.get("/health")
+        assert len(response.headers.get_list("X-Content-Type-Options")) == 1
+
+class TestCorsPreflight:
+    async def test_preflight_is_cacheable(self, client: AsyncClient):
+        origin = get_settings().cors_origins_list[0]
+        response = await client.options(
+            "/api/tasks",
+            headers={
+                "Origin": origin,
+                "Access-Control-Request-Method": "PUT",
+                "Access-Control-Request-Headers": "authorization,content-type",
+            },
+        )
+        assert response.status_code == 200
+        assert response.headers["access-control-max-age"] == str(get_settings().cors_max_age)
+        assert response.headers["access-control-allow-origin"] == origin
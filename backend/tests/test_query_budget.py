@@ -0,0 +1,114 @@
+from httpx import AsyncClient
+
+from app.middleware.metrics import ROUND_TRIPS_HEADER, STATEMENTS_HEADER
+from app.models.user import User
+
+# Budgets count every statement a request runs, including the set_config that
+# applies the RLS context at the start of each transaction.
+# Each test warms the principal cache first, as steady-state traffic does.
+
+async def _create_tasks(client: AsyncClient, headers: dict, count: int) -> list[dict]:
+    tasks = []
+    for i in range(count):
+        response = await client.post("/api/tasks", json={"title": f"Task {i}"}, headers=headers)
+        tasks.append(response.json())
+    return tasks
+
+class TestQueryBudgets:
+    async def test_headers_report_request_cost(self, client: AsyncClient, auth_headers: dict):
+        response = await client.get("/api/tasks/stats", headers=auth_headers)
+        assert response.status_code == 200
+        # RLS context, principal lookup, stats row
+        assert int(response.headers[STATEMENTS_HEADER]) == 3
+        assert int(response.headers[ROUND_TRIPS_HEADER]) >= 3
+
+    async def test_list_tasks(self, client: AsyncClient, auth_headers: dict, query_budget):
+        await _create_tasks(client, auth_headers, 5)
+
+        # Stats row plus one page query, however many tasks are on the page
+        response = await client.get("/api/tasks", headers=auth_headers)
+        assert len(response.json()["tasks"]) == 5
+        query_budget(response, statements=3)
+
+        # Revalidation stops at the stats row
+        response = await client.get(
+            "/api/tasks", headers={**auth_headers, "If-None-Match": response.headers["ETag"]}
+        )
+        assert response.status_code == 304
+        query_budget(response, statements=2)
+
+    async def test_search_tasks(self, client: AsyncClient, auth_headers: dict, query_budget):
+        await _create_tasks(client, auth_headers, 5)
+
+        # One ranked query, however many tasks match
+        response = await client.get("/api/tasks/search", params={"q": "task"}, headers=auth_headers)
+        assert len(response.json()["tasks"]) == 5
+        query_budget(response, statements=2)
+
+    async def test_get_task(self, client: AsyncClient, auth_headers: dict, query_budget):
+        [task] = await _create_tasks(client, auth_headers, 1)
+
+        response = await client.get(f"/api/tasks/{task['id']}", headers=auth_headers)
+        assert response.status_code == 200
+        query_budget(response, statements=2)
+
+    async def test_create_task(self, client: AsyncClient, auth_headers: dict, query_budget):
+        await client.get("/api/tasks/stats", headers=auth_headers)
+
+        # INSERT ... RETURNING fills in the server defaults; no refresh
+        response = await client.post("/api/tasks", json={"title": "Budgeted"}, headers=auth_headers)
+        assert response.status_code == 201
+        query_budget(response, statements=2)
+
+    async def test_update_task(self, client: AsyncClient, auth_headers: dict, query_budget):
+        [task] = await _create_tasks(client, auth_headers, 1)
+
+        response = await client.put(
+            f"/api/tasks/{task['id']}", json={"is_completed": True}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        # Load, then UPDATE ... RETURNING updated_at
+        query_budget(response, statements=3)
+
+    async def test_refresh(self, client: AsyncClient, test_user: User, query_budget):
+        login = await client.post(
+            "/api/auth/login",
+            json={"email": test_user.email, "password": "testpassword123"},
+        )
+        token = login.cookies["refresh_token"]
+
+        # Rotation is a single statement in its own transaction
+        response = await client.post(
+            "/api/auth/refresh", headers={"Cookie": f"refresh_token={token}"}
+        )
+        assert response.status_code == 200
+        query_budget(response, statements=1, round_trips=3)
+
+    async def test_update_user_status(
+        self, client: AsyncClient, admin_headers: dict, test_user: User, query_budget
+    ):
+        await client.get(f"/api/admin/users/{test_user.id}", headers=admin_headers)
+
+        response = await client.patch(
+            f"/api/admin/users/{test_user.id}",
+            json={"is_active": False},
+            headers=admin_headers,
+        )
+        assert response.status_code == 200
+        # UPDATE ... RETURNING with the task count, then the NOTIFY that
+        # evicts the principal on other workers
+        query_budget(response, statements=3)
+
+    async def test_list_users(
+        self, client: AsyncClient, admin_headers: dict, test_user: User, query_budget
+    ):
+        await client.get(f"/api/admin/users/{test_user.id}", headers=admin_headers)
+
+        # Page, per-page task counts and the capped total in one statement
+        response = await client.get(
+            "/api/admin/users",
+            params={"email": "example", "is_active": "true"},
+            headers=admin_headers,
+        )
+        assert len(response.json()["users"]) == 2
+        query_budget(response, statements=2)
@@ -0,0 +1,22 @@
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+from app.api.responses import project
+
+
+class Item(BaseModel):
+    id: int
+    note: str | None = None
+
+class TestProject:
+    def test_missing_optional_field_takes_default(self):
+        assert project({"id": 1}, Item) == {"id": 1, "note": None}
+        assert project(SimpleNamespace(id=1), Item) == {"id": 1, "note": None}
+
+    def test_missing_required_field_raises(self):
+        with pytest.raises(KeyError, match="Item.id"):
+            project({"note": "x"}, Item)
+        with pytest.raises(AttributeError, match="Item.id"):
+            project(SimpleNamespace(note="x"), Item)
@@ -0,0 +1,24 @@
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+def _imported_after(statement: str) -> set[str]:
+    result = subprocess.run(
+        [sys.executable, "-c", f"{statement}\nimport sys\nprint(' '.join(sys.modules))"],
+        cwd=BACKEND,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return {name.split(".")[0] for name in result.stdout.split()}
+
+class TestImportCost:
+    def test_cli_defers_the_web_stack_to_its_commands(self):
+        imported = _imported_after("import app.cli")
+        assert not imported & {"sqlalchemy", "fastapi", "pydantic", "asyncpg", "uvicorn"}
+
+    def test_database_builds_no_engine_at_import(self):
+        imported = _imported_after("import app.database\nassert app.database._engine is None")
+        assert "asyncpg" not in imported
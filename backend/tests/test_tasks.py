@@ -1,10 +1,15 @@
+import csv
+import io
+import json
 import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import uuid4
 
+from app.config import get_settings
 from app.models.user import User
 from app.models.task import Task
+from app.schemas.task import TaskResponse
 
 class TestCreateTask:
     async def test_create_task(self, client: AsyncClient, auth_headers: dict):
@@ -58,6 +63,113 @@ class TestListTasks:
         data = response.json()
         assert data["total"] == 0
         assert data["tasks"] == []
+        assert data["next_cursor"] is None
+
+    async def test_cursor_pagination_walks_all_tasks(
+        self, client: AsyncClient, auth_headers: dict, test_user: User, db: AsyncSession
+    ):
+        db.add_all([Task(user_id=test_user.id, title=f"Task {i}") for i in range(5)])
+        await db.commit()
+
+        seen = []
+        params = {"limit": 2}
+        while True:
+            response = await client.get("/api/tasks", params=params, headers=auth_headers)
+            assert response.status_code == 200
+            data = response.json()
+            assert data["total"] == 5
+            seen.extend(t["id"] for t in data["tasks"])
+            if data["next_cursor"] is None:
+                break
+            params = {"limit": 2, "cursor": data["next_cursor"]}
+
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+
+    async def test_offset_pagination_still_supported(
+        self, client: AsyncClient, auth_headers: dict, test_user: User, db: AsyncSession
+    ):
+        db.add_all([Task(user_id=test_user.id, title=f"Task {i}") for i in range(3)])
+        await db.commit()
+
+        response = await client.get("/api/tasks", params={"limit": 2, "offset": 2}, headers=auth_headers)
+        assert response.status_code == 200
+        assert len(response.json()["tasks"]) == 1
+
+    async def test_invalid_cursor_rejected(self, client: AsyncClient, auth_headers: dict):
+        response = await client.get("/api/tasks", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+        assert response.status_code == 400
+
+class TestSearchTasks:
+    async def test_title_matches_rank_first(
+        self, client: AsyncClient, auth_headers: dict, test_user: User, db: AsyncSession
+    ):
+        db.add_all([
+            Task(user_id=test_user.id, title="Misc", description="Prepare the quarterly report"),
+            Task(user_id=test_user.id, title="Quarterly reports"),
+            Task(user_id=test_user.id, title="Groceries", description="Milk and eggs"),
+        ])
+        await db.commit()
+
+        response = await client.get("/api/tasks/search", params={"q": "report"}, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        # Stemmed: "report" matches "reports"; the title hit outranks the description hit
+        assert [t["title"] for t in data["tasks"]] == ["Quarterly reports", "Misc"]
+        assert data["next_cursor"] is None
+
+    async def test_web_search_syntax(
+        self, client: AsyncClient, auth_headers: dict, test_user: User, db: AsyncSession
+    ):
+        db.add_all([
+            Task(user_id=test_user.id, title="Call the bank"),
+            Task(user_id=test_user.id, title="Call mom"),
+        ])
+        await db.commit()
+
+        response = await client.get("/api/tasks/search", params={"q": "call -bank"}, headers=auth_headers)
+        assert [t["title"] for t in response.json()["tasks"]] == ["Call mom"]
+
+    async def test_cursor_pagination_walks_all_matches(
+        self, client: AsyncClient, auth_headers: dict, test_user: User, db: AsyncSession
+    ):
+        db.add_all([Task(user_id=test_user.id, title=f"Write report {i}") for i in range(5)])
+        db.add(Task(user_id=test_user.id, title="Unrelated"))
+        await db.commit()
+
+        seen = []
+        params = {"q": "report", "limit": 2}
+        while True:
+            response = await client.get("/api/tasks/search", params=params, headers=auth_headers)
+            assert response.status_code == 200
+            data = response.json()
+            seen.extend(t["id"] for t in data["tasks"])
+            if data["next_cursor"] is None:
+                break
+            params = {"q": "report", "limit": 2, "cursor": data["next_cursor"]}
+
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+
+    async def test_only_own_tasks_match(
+        self, client: AsyncClient, auth_headers: dict, test_user: User, test_admin: User, db: AsyncSession
+    ):
+        db.add_all([
+            Task(user_id=test_user.id, title="My invoice"),
+            Task(user_id=test_admin.id, title="Admin invoice"),
+        ])
+        await db.commit()
+
+        response = await client.get("/api/tasks/search", params={"q": "invoice"}, headers=auth_headers)
+        assert [t["title"] for t in response.json()["tasks"]] == ["My invoice"]
+
+    async def test_rejects_empty_query_and_bad_cursor(self, client: AsyncClient, auth_headers: dict):
+        response = await client.get("/api/tasks/search", params={"q": ""}, headers=auth_headers)
+        assert response.status_code == 422
+        response = await client.get(
+            "/api/tasks/search", params={"q": "x", "cursor": "not-a-cursor"}, headers=auth_headers
+        )
+        assert response.status_code == 400
 
 class TestGetTask:
     async def test_get_single_task(self, client: AsyncClient, auth_headers: dict, test_user: User, db: AsyncSession):
@@ -76,6 +188,18 @@ class TestGetTask:
         response = await client.get(f"/api/tasks/{uuid4()}", headers=auth_headers)
         assert response.status_code == 404
 
+    async def test_response_matches_schema_serialization(
+        self, client: AsyncClient, auth_headers: dict, test_user: User, db: AsyncSession
+    ):
+        task = Task(user_id=test_user.id, title="Test Task", description=None)
+        db.add(task)
+        await db.commit()
+        await db.refresh(task)
+
+        # The orjson fast path must emit exactly what the pydantic schema would
+        response = await client.get(f"/api/tasks/{task.id}", headers=auth_headers)
+        assert response.json() == TaskResponse.model_validate(task).model_dump(mode="json")
+
 class TestUpdateTask:
     async def test_update_task(self, client: AsyncClient, auth_headers: dict, test_user: User, db: AsyncSession):
         task = Task(user_id=test_user.id, title="Original Title")
@@ -146,3 +270,245 @@ class TestTaskIsolation:
 
         response = await client.delete(f"/api/tasks/{admin_task.id}", headers=auth_headers)
         assert response.status_code == 404
+
+class TestTaskStats:
+    async def test_stats_track_create_update_delete(self, client: AsyncClient, auth_headers: dict):
+        created = []
+        for title in ("One", "Two", "Three"):
+            response = await client.post("/api/tasks", json={"title": title}, headers=auth_headers)
+            created.append(response.json()["id"])
+
+        await client.put(f"/api/tasks/{created[0]}", json={"is_completed": True}, headers=auth_headers)
+        await client.delete(f"/api/tasks/{created[1]}", headers=auth_headers)
+
+        response = await client.get("/api/tasks/stats", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json() == {"total": 2, "completed": 1, "open": 1}
+
+    async def test_list_total_respects_completion_filter(
+        self, client: AsyncClient, auth_headers: dict, test_user: User, db: AsyncSession
+    ):
+        db.add_all([
+            Task(user_id=test_user.id, title="Done", is_completed=True),
+            Task(user_id=test_user.id, title="Open 1"),
+            Task(user_id=test_user.id, title="Open 2"),
+        ])
+        await db.commit()
+
+        response = await client.get("/api/tasks", params={"is_completed": False}, headers=auth_headers)
+        assert response.json()["total"] == 2
+
+        response = await client.get("/api/tasks", params={"is_completed": True}, headers=auth_headers)
+        assert response.json()["total"] == 1
+
+class TestConditionalGet:
+    async def test_list_not_modified_until_a_write(self, client: AsyncClient, auth_headers: dict):
+        await client.post("/api/tasks", json={"title": "One"}, headers=auth_headers)
+
+        response = await client.get("/api/tasks", headers=auth_headers)
+        etag = response.headers["etag"]
+        assert etag.startswith('W/"')
+
+        response = await client.get("/api/tasks", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        # Different query parameters are a different representation
+        response = await client.get(
+            "/api/tasks", params={"limit": 1}, headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 200
+
+        await client.post("/api/tasks", json={"title": "Two"}, headers=auth_headers)
+        response = await client.get("/api/tasks", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["total"] == 2
+
+    async def test_single_task_etag_changes_on_update(self, client: AsyncClient, auth_headers: dict):
+        task_id = (await client.post("/api/tasks", json={"title": "One"}, headers=auth_headers)).json()["id"]
+
+        etag = (await client.get(f"/api/tasks/{task_id}", headers=auth_headers)).headers["etag"]
+        response = await client.get(f"/api/tasks/{task_id}", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+
+        await client.put(f"/api/tasks/{task_id}", json={"is_completed": True}, headers=auth_headers)
+        response = await client.get(f"/api/tasks/{task_id}", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["is_completed"] is True
+
+class TestBatchTasks:
+    async def test_batch_mixed_operations(
+        self, client: AsyncClient, auth_headers: dict, test_user: User, db: AsyncSession
+    ):
+        existing = Task(user_id=test_user.id, title="Existing")
+        doomed = Task(user_id=test_user.id, title="Doomed")
+        db.add_all([existing, doomed])
+        await db.commit()
+        missing_id = str(uuid4())
+
+        response = await client.post(
+            "/api/tasks/batch",
+            json={"operations": [
+                {"op": "create", "title": "New 1"},
+                {"op": "create", "title": "New 2", "description": "Second"},
+                {"op": "update", "id": str(existing.id), "is_completed": True},
+                {"op": "update", "id": missing_id, "title": "Nope"},
+                {"op": "delete", "id": str(doomed.id)},
+            ]},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+        assert results[0]["task"]["title"] == "New 1"
+        assert results[1]["task"]["description"] == "Second"
+        assert results[2]["status"] == "ok"
+        assert results[2]["task"]["is_completed"] is True
+        assert results[2]["task"]["title"] == "Existing"
+        assert results[3]["status"] == "not_found"
+        assert results[4]["status"] == "ok"
+
+        stats = (await client.get("/api/tasks/stats", headers=auth_headers)).json()
+        assert stats == {"total": 3, "completed": 1, "open": 2}
+
+    async def test_batch_complete_all_then_delete_completed(
+        self, client: AsyncClient, auth_headers: dict, test_user: User, db: AsyncSession
+    ):
+        db.add_all([Task(user_id=test_user.id, title=f"Task {i}") for i in range(3)])
+        await db.commit()
+
+        response = await client.post(
+            "/api/tasks/batch",
+            json={"operations": [
+                {"op": "update_where", "where": {"is_completed": False}, "set": {"is_completed": True}},
+                {"op": "delete_where", "where": {"is_completed": True}},
+            ]},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert results[0]["affected"] == 3
+        assert results[1]["affected"] == 3
+
+        stats = (await client.get("/api/tasks/stats", headers=auth_headers)).json()
+        assert stats["total"] == 0
+
+    async def test_batch_cannot_touch_other_users_tasks(
+        self, client: AsyncClient, auth_headers: dict, test_admin: User, db: AsyncSession
+    ):
+        admin_task = Task(user_id=test_admin.id, title="Admin's task")
+        db.add(admin_task)
+        await db.commit()
+
+        response = await client.post(
+            "/api/tasks/batch",
+            json={"operations": [{"op": "delete", "id": str(admin_task.id)}]},
+            headers=auth_headers,
+        )
+        assert response.json()["results"][0]["status"] == "not_found"
+
+    async def test_batch_rejects_duplicate_targets(self, client: AsyncClient, auth_headers: dict):
+        task_id = str(uuid4())
+        response = await client.post(
+            "/api/tasks/batch",
+            json={"operations": [
+                {"op": "update", "id": task_id, "title": "A"},
+                {"op": "delete", "id": task_id},
+            ]},
+            headers=auth_headers,
+        )
+        assert response.status_code == 422
+
+    async def test_batch_size_limit(self, client: AsyncClient, auth_headers: dict):
+        limit = get_settings().task_batch_max_operations
+        response = await client.post(
+            "/api/tasks/batch",
+            json={"operations": [{"op": "create", "title": "x"}] * (limit + 1)},
+            headers=auth_headers,
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["type"] == "too_long"
+
+class TestExportTasks:
+    async def test_export_ndjson(
+        self, client: AsyncClient, auth_headers: dict, test_user: User, test_admin: User, db: AsyncSession
+    ):
+        db.add_all([Task(user_id=test_user.id, title=f"Task {i}") for i in range(3)])
+        db.add(Task(user_id=test_admin.id, title="Admin's task"))
+        await db.commit()
+
+        response = await client.get("/api/tasks/export", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 3
+        assert all(line["title"].startswith("Task") for line in lines)
+
+    async def test_export_csv(
+        self, client: AsyncClient, auth_headers: dict, test_user: User, db: AsyncSession
+    ):
+        db.add(Task(user_id=test_user.id, title="Comma, inside", description="Line\nbreak"))
+        await db.commit()
+
+        response = await client.get("/api/tasks/export", params={"format": "csv"}, headers=auth_headers)
+        assert response.status_code == 200
+
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0] == ["id", "title", "description", "is_completed", "created_at", "updated_at"]
+        assert rows[1][1] == "Comma, inside"
+        assert rows[1][2] == "Line\nbreak"
+
+    async def test_export_rejects_unknown_format(self, client: AsyncClient, auth_headers: dict):
+        response = await client.get("/api/tasks/export", params={"format": "xml"}, headers=auth_headers)
+        assert response.status_code == 422
+
+class TestImportTasks:
+    async def test_import_ndjson_reports_rejected_rows(self, client: AsyncClient, auth_headers: dict):
+        body = "\n".join([
+            json.dumps({"title": "Imported 1", "description": "First"}),
+            json.dumps({"title": ""}),
+            "not json",
+            json.dumps({"title": "Imported 2"}),
+        ])
+        response = await client.post("/api/tasks/import", content=body, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["imported"] == 2
+        assert data["rejected_count"] == 2
+        assert [r["line"] for r in data["rejected"]] == [2, 3]
+
+        stats = (await client.get("/api/tasks/stats", headers=auth_headers)).json()
+        assert stats["total"] == 2
+
+    async def test_import_rejects_lines_that_are_not_utf8(
+        self, client: AsyncClient, auth_headers: dict
+    ):
+        body = b"\n".join([
+            json.dumps({"title": "Café"}, ensure_ascii=False).encode(),
+            json.dumps({"title": "Latin-1 café"}, ensure_ascii=False).encode("latin-1"),
+        ])
+        response = await client.post("/api/tasks/import", content=body, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["imported"] == 1
+        assert data["rejected"] == [{"line": 2, "error": "Invalid UTF-8 at byte 22 of the line"}]
+
+    async def test_import_csv_round_trips_export(
+        self, client: AsyncClient, auth_headers: dict, test_user: User, db: AsyncSession
+    ):
+        db.add(Task(user_id=test_user.id, title="Comma, inside", description="Line\nbreak"))
+        await db.commit()
+        exported = await client.get("/api/tasks/export", params={"format": "csv"}, headers=auth_headers)
+
+        response = await client.post(
+            "/api/tasks/import",
+            params={"format": "csv"},
+            content=exported.content,
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["imported"] == 1
+
+        tasks = (await client.get("/api/tasks", headers=auth_headers)).json()["tasks"]
+        assert [t["description"] for t in tasks] == ["Line\nbreak", "Line\nbreak"]
@@ -0,0 +1,43 @@
+import gc
+import logging
+import time
+
+import pytest
+
+from app.config import get_settings
+from app.database import _create_engine, pool_stats
+from app.services.hashing import HashingPool
+from app.services.warmup import warm_up
+from tests.conftest import TEST_DATABASE_URL
+
+
+@pytest.fixture
+async def pooled_engine():
+    engine = _create_engine(TEST_DATABASE_URL)
+    yield engine
+    await engine.dispose()
+
+class TestWarmup:
+    async def test_opens_and_primes_pool_connections(self, pooled_engine, caplog, monkeypatch):
+        caplog.set_level(logging.INFO, logger="app.services.warmup")
+        # Freezing would leave the rest of the test session uncollected
+        frozen = []
+        monkeypatch.setattr(gc, "freeze", lambda: frozen.append(True))
+
+        await warm_up(pooled_engine)
+
+        settings = get_settings()
+        expected = min(settings.db_pool_warm_connections, settings.db_pool_size)
+        assert pool_stats(pooled_engine)["checked_in"] == expected
+        assert "Warmed up" in caplog.text
+        assert frozen
+
+    async def test_hashing_pool_starts_every_worker(self):
+        pool = HashingPool(workers=2, queue_size=0)
+        try:
+            # Each job outlasts the submissions, as a real hash does
+            await pool.warm(time.sleep, 0.05)
+            assert len(pool._executor._threads) == 2
+            assert pool.in_flight == 0
+        finally:
+            pool.shutdown()